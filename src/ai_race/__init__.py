@@ -0,0 +1,12 @@
+"""
+Modules of the project import each other by their names (like when scripts are run from this directory),
+so this directory is put on the path when the package is imported, e.g. by `python -m ai_race.train`.
+Workers of process pools inherit the path
+"""
+
+import os
+import sys
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+if _DIRECTORY not in sys.path:
+    sys.path.insert(0, _DIRECTORY)
@@ -0,0 +1,26 @@
+"""
+Launcher of command line tools from `src` directory:
+
+    python -m ai_race train --seed 42 --workers 4
+    python -m ai_race sweep sweep.json --workers 4
+    python -m ai_race benchmark --output results.json
+
+Tools can be also run as modules (e.g. `python -m ai_race.train --seed 42`) or as scripts from this directory
+(e.g. `python train.py --seed 42`). Path to modules of the project is set up by the package (see `__init__.py`)
+"""
+
+import sys
+import importlib
+
+COMMANDS = ('train', 'sweep', 'benchmark')
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        sys.exit(f'Usage: python -m ai_race {{{",".join(COMMANDS)}}} [arguments]')
+
+    importlib.import_module(sys.argv[1]).main(sys.argv[2:])
+
+
+if __name__ == '__main__':
+    main()
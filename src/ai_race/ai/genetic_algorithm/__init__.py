@@ -3,10 +3,13 @@ Based on https://github.com/kiecodes/genetic-algorithms/tree/master
 """
 
 import typing as t
+import copy
+from functools import partial
 from random import choice, choices, randrange, uniform
 
+from profiler import profiler
 from ai.neural_network import NeuralNetwork
-from .crossovers import uniform_crossover
+from .crossovers import uniform_crossover, single_point_crossover
 
 
 class Individual(t.NamedTuple):
@@ -19,6 +22,7 @@ SortFunction = t.Callable[[Population], Population]
 SelectionFunction = t.Callable[[Population], t.Annotated[t.List[Individual], 2]]
 MutationFunction = t.Callable[[Individual], Individual]
 CrossoverFunction = t.Callable[[Individual, Individual], t.Tuple[Individual, Individual]]
+EvolutionFunction = t.Callable[[Population], Population]
 
 
 def _fitness_based_sort(population: Population) -> Population:
@@ -29,6 +33,11 @@ def _fitness_based_sort(population: Population) -> Population:
 def _fitness_based_selection(population: Population) -> t.Annotated[t.List[Individual], 2]:
     """Selects two random individuals from population based on their fitness"""
     population_fitness = sum([individual.fitness for individual in population])
+
+    # All individuals are equally bad, so they are equally likely to be selected
+    if population_fitness <= 0:
+        return choices(population=population, k=2)
+
     return choices(
         population=population,
         weights=[individual.fitness / population_fitness for individual in population],
@@ -48,16 +57,19 @@ def _random_mutation(individual: Individual, num: int = 1, probability: float =
         if uniform(0, 1) <= probability:
             layer = choice(individual.neural_network.weighted_layers)
 
-            shape = layer.weights.shape
-            flatten_weights = layer.weights.flatten()
-
-            index = randrange(len(flatten_weights))
-            flatten_weights[index] += uniform(-2.0, 2.0)
-            layer.weights = flatten_weights.reshape(shape)
+            # Flat view of weights, so nothing is copied
+            index = randrange(layer.weights.size)
+            layer.weights.flat[index] += uniform(-2.0, 2.0)
 
     return individual
 
 
+def _copy_individual(individual: Individual) -> Individual:
+    """Copies individual with its neural network"""
+    return Individual(neural_network=copy.deepcopy(individual.neural_network), fitness=individual.fitness)
+
+
+@profiler.timed('evolution')
 def run_evolution(
         population: Population,
         sort_function: SortFunction = _fitness_based_sort,
@@ -66,7 +78,8 @@ def run_evolution(
         mutation_function: MutationFunction = _random_mutation
 ) -> Population:
     """
-    Runs evolution of given population
+    Runs evolution of given population. Individuals of given population aren't changed:
+    the best ones are passed to the next generation as they are and offsprings are created from copies of parents
 
     :param population: Population to evolve
     :param sort_function: Function of sorting population in a certain order
@@ -81,8 +94,10 @@ def run_evolution(
     next_generation = sorted_population[0:2 + (population_size % 2)]
     for j in range(int(population_size / 2) - 1):
         parents = selection_function(sorted_population)
-        father = parents[0]
-        mother = parents[1]
+        # Crossover and mutation work in place, so an individual selected several times (or an elite one)
+        # would be shared by offsprings
+        father = _copy_individual(parents[0])
+        mother = _copy_individual(parents[1])
 
         offspring_a, offspring_b = crossover_function(father, mother)
         offspring_a = mutation_function(offspring_a)
@@ -93,6 +108,36 @@ def run_evolution(
     return next_generation
 
 
+crossover_functions: t.Dict[str, CrossoverFunction] = {
+    'uniform': uniform_crossover,
+    'single_point': single_point_crossover
+}
+
+
+def create_evolution_function(
+        crossover: str = 'uniform',
+        mutation_number: int = 1,
+        mutation_probability: float = 0.5
+) -> EvolutionFunction:
+    """
+    Creates :func:`run_evolution` with given crossover and mutation parameters
+
+    :param crossover: Name of crossover function from `crossover_functions`
+    :param mutation_number: Number of mutations of every offspring
+    :param mutation_probability: Probability of every mutation (from 0 to 1)
+
+    :raises ValueError: If crossover function is unknown
+    """
+    if crossover not in crossover_functions:
+        raise ValueError(f'Unknown crossover function: {crossover}. Available: {list(crossover_functions)}')
+
+    return partial(
+        run_evolution,
+        crossover_function=crossover_functions[crossover],
+        mutation_function=partial(_random_mutation, num=mutation_number, probability=mutation_probability)
+    )
+
+
 def print_population(population: Population) -> None:
     population_size = len(population)
     fitness_list = [individual.fitness for individual in population]
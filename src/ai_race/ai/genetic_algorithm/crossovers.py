@@ -1,5 +1,5 @@
 import typing as t
-from random import randint, uniform
+from random import randint
 
 import numpy as np
 
@@ -63,6 +63,16 @@ def _process_biases(layer_a: Layer, layer_b: Layer) -> t.Tuple[Shape, np.ndarray
     return shape, bias_a, bias_b
 
 
+def _get_crossover_point(length: int) -> int:
+    """
+    Chooses point that splits array into two non-empty parts.
+    Array of one element can't be split, so it is either kept or swapped as a whole
+    """
+    if length < 2:
+        return randint(0, length)
+    return randint(1, length - 1)
+
+
 def single_point_crossover(a: "Individual", b: "Individual") -> t.Tuple["Individual", "Individual"]:
     """
     Single Point Crossover is a form of crossover in which two-parent chromosome are
@@ -79,22 +89,23 @@ def single_point_crossover(a: "Individual", b: "Individual") -> t.Tuple["Individ
         # Crossing weights
         weights_shape, flatten_weights_a, flatten_weights_b = _process_weights(layer_a, layer_b)
 
-        p = randint(1, len(flatten_weights_a) - 1)
+        p = _get_crossover_point(len(flatten_weights_a))
         offspring_a_weights = np.concatenate([flatten_weights_a[:p], flatten_weights_b[p:]]).reshape(weights_shape)
         offspring_b_weights = np.concatenate([flatten_weights_b[:p], flatten_weights_a[p:]]).reshape(weights_shape)
 
-        layer_a.weights = offspring_a_weights
-        layer_b.weights = offspring_b_weights
+        # Weights are views of genome buffer of neural network, so they are overwritten in place
+        layer_a.weights[...] = offspring_a_weights
+        layer_b.weights[...] = offspring_b_weights
 
         # Crossing biases
         bias_shape, bias_a, bias_b = _process_biases(layer_a, layer_b)
 
-        k = randint(1, len(bias_a) - 1)
+        k = _get_crossover_point(len(bias_a))
         offspring_a_bias = np.concatenate([bias_a[:k], bias_b[k:]])
         offspring_b_bias = np.concatenate([bias_b[:k], bias_a[k:]])
 
-        layer_a.bias = offspring_a_bias
-        layer_b.bias = offspring_b_bias
+        layer_a.bias[...] = offspring_a_bias
+        layer_b.bias[...] = offspring_b_bias
 
     return a, b
 
@@ -110,38 +121,16 @@ def uniform_crossover(a: "Individual", b: "Individual") -> t.Tuple["Individual",
     for layer_a, layer_b in zip(a.neural_network.weighted_layers, b.neural_network.weighted_layers):
         _check_compatibility(layer_a, layer_b)
 
-        # Crossing weights
-        weights_shape, flatten_weights_a, flatten_weights_b = _process_weights(layer_a, layer_b)
-
-        offspring_a_weights = np.array([])
-        offspring_b_weights = np.array([])
-
-        for gen_a, gen_b in zip(flatten_weights_a, flatten_weights_b):
-            if uniform(0, 1) <= 0.5:
-                offspring_a_weights = np.append(offspring_a_weights, gen_b)
-                offspring_b_weights = np.append(offspring_b_weights, gen_a)
-            else:
-                offspring_a_weights = np.append(offspring_a_weights, gen_a)
-                offspring_b_weights = np.append(offspring_b_weights, gen_b)
-
-        layer_a.weights = offspring_a_weights.reshape(weights_shape)
-        layer_b.weights = offspring_b_weights.reshape(weights_shape)
-
-        # Crossing biases
-        bias_shape, bias_a, bias_b = _process_biases(layer_a, layer_b)
-
-        offspring_a_bias = np.array([])
-        offspring_b_bias = np.array([])
+    # Genome contains weights and bias of every layer one after another, so the whole
+    # neural network is crossed at once (each gen is swapped with probability 0.5)
+    genome_a = a.neural_network.get_genome()
+    genome_b = b.neural_network.get_genome()
+    swap_mask = np.random.rand(genome_a.size) <= 0.5
 
-        for bias_a_unit, bias_b_unit in zip(bias_a, bias_b):
-            if uniform(0, 1) <= 0.5:
-                offspring_a_bias = np.append(offspring_a_bias, bias_b_unit)
-                offspring_b_bias = np.append(offspring_b_bias, bias_a_unit)
-            else:
-                offspring_a_bias = np.append(offspring_a_bias, bias_a_unit)
-                offspring_b_bias = np.append(offspring_b_bias, bias_b_unit)
+    offspring_a_genome = np.where(swap_mask, genome_b, genome_a)
+    offspring_b_genome = np.where(swap_mask, genome_a, genome_b)
 
-        layer_a.bias = offspring_a_bias.reshape(bias_shape)
-        layer_b.bias = offspring_b_bias.reshape(bias_shape)
+    genome_a[:] = offspring_a_genome
+    genome_b[:] = offspring_b_genome
 
     return a, b
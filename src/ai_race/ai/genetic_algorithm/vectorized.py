@@ -0,0 +1,237 @@
+"""
+Genetic operators that work on the whole population at once.
+Population is represented as a matrix with shape (population size, genome length),
+where every row contains all weights and biases of one neural network
+"""
+
+import typing as t
+import copy
+from statistics import NormalDist
+
+import numpy as np
+
+from profiler import profiler
+from ai.neural_network import NeuralNetwork
+from ai.genetic_algorithm import Individual, Population, EvolutionFunction
+
+MatrixCrossoverFunction = t.Callable[
+    [np.ndarray, np.ndarray, np.random.Generator],
+    t.Tuple[np.ndarray, np.ndarray]
+]
+
+
+def population_to_matrix(neural_networks: t.Sequence[NeuralNetwork]) -> np.ndarray:
+    """Stacks genomes of neural networks into matrix with shape (population size, genome length)"""
+    return np.stack([neural_network.get_genome() for neural_network in neural_networks])
+
+
+def matrix_to_population(matrix: np.ndarray, template: NeuralNetwork) -> t.List[NeuralNetwork]:
+    """
+    Creates neural networks from rows of genome matrix
+
+    :param matrix: Genome matrix with shape (population size, genome length)
+    :param template: Neural network with the same topology
+    """
+    neural_networks = []
+    for genome in matrix:
+        neural_network = copy.deepcopy(template)
+        neural_network.set_genome(genome)
+        neural_networks.append(neural_network)
+
+    return neural_networks
+
+
+def uniform_crossover(
+        parents_a: np.ndarray,
+        parents_b: np.ndarray,
+        rng: np.random.Generator
+) -> t.Tuple[np.ndarray, np.ndarray]:
+    """Each gen of every pair of parents is swapped with probability 0.5"""
+    swap_mask = rng.random(parents_a.shape) < 0.5
+
+    return np.where(swap_mask, parents_b, parents_a), np.where(swap_mask, parents_a, parents_b)
+
+
+def single_point_crossover(
+        parents_a: np.ndarray,
+        parents_b: np.ndarray,
+        rng: np.random.Generator
+) -> t.Tuple[np.ndarray, np.ndarray]:
+    """Genes of every pair of parents are swapped after random point (own point for every pair)"""
+    return multi_point_crossover(parents_a, parents_b, rng, points=1)
+
+
+def multi_point_crossover(
+        parents_a: np.ndarray,
+        parents_b: np.ndarray,
+        rng: np.random.Generator,
+        points: int = 2
+) -> t.Tuple[np.ndarray, np.ndarray]:
+    """Genes of every pair of parents are swapped between every odd and even random point"""
+    pairs_number, genome_length = parents_a.shape
+    if genome_length < 2:
+        return parents_a.copy(), parents_b.copy()
+
+    cut_points = rng.integers(1, genome_length, size=(pairs_number, points))
+
+    # Number of cut points before every gen. Genes after odd number of points are swapped
+    cuts_before = (np.arange(genome_length)[np.newaxis, np.newaxis, :] >= cut_points[:, :, np.newaxis]).sum(axis=1)
+    swap_mask = cuts_before % 2 == 1
+
+    return np.where(swap_mask, parents_b, parents_a), np.where(swap_mask, parents_a, parents_b)
+
+
+crossover_functions: t.Dict[str, MatrixCrossoverFunction] = {
+    'uniform': uniform_crossover,
+    'single_point': single_point_crossover,
+    'multi_point': multi_point_crossover
+}
+
+
+def gaussian_mutation(
+        genomes: np.ndarray,
+        rng: np.random.Generator,
+        probability: float = 0.01,
+        scale: float = 1.0
+) -> np.ndarray:
+    """
+    Adds normally distributed noise to random genes
+
+    :param genomes: Genome matrix with shape (population size, genome length)
+    :param rng: Random generator
+    :param probability: Probability of mutation of every gen (from 0 to 1)
+    :param scale: Standard deviation of noise
+    """
+    if probability <= 0:
+        return genomes.copy()
+
+    # One draw per generation: the first half decides which genes mutate, the second one is noise
+    samples = rng.standard_normal((2, *genomes.shape))
+    threshold = NormalDist().inv_cdf(probability) if probability < 1 else np.inf
+    mutation_mask = samples[0] < threshold
+
+    return genomes + mutation_mask * samples[1] * scale
+
+
+def fitness_based_selection(fitness: np.ndarray, pairs_number: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Selects pairs of parents with probability proportional to their fitness
+
+    :return: Indices of parents with shape (pairs number, 2)
+    """
+    fitness = np.asarray(fitness, dtype=float)
+    total_fitness = fitness.sum()
+    probabilities = fitness / total_fitness if total_fitness > 0 else None
+
+    return rng.choice(len(fitness), size=(pairs_number, 2), p=probabilities)
+
+
+def evolve_genomes(
+        genomes: np.ndarray,
+        fitness: np.ndarray,
+        rng: t.Optional[np.random.Generator] = None,
+        crossover: str = 'uniform',
+        mutation_probability: float = 0.01,
+        mutation_scale: float = 1.0
+) -> np.ndarray:
+    """
+    Runs evolution of population represented by genome matrix. As in :func:`run_evolution`,
+    two best individuals (three if population size is odd) are moved to the next generation unchanged
+
+    :param genomes: Genome matrix with shape (population size, genome length)
+    :param fitness: Fitness of every individual with shape (population size,)
+    :param rng: Random generator (default = None, which means new generator with random seed)
+    :param crossover: Name of crossover function ('uniform', 'single_point' or 'multi_point')
+    :param mutation_probability: Probability of mutation of every gen of offsprings
+    :param mutation_scale: Standard deviation of mutation noise
+    :return: Genome matrix of the next generation
+
+    :raises ValueError: If crossover function is unknown
+    """
+    if crossover not in crossover_functions:
+        raise ValueError(f'Unknown crossover function: {crossover}. Available: {list(crossover_functions)}')
+
+    rng = rng or np.random.default_rng()
+    population_size = len(genomes)
+    order = np.argsort(-np.asarray(fitness, dtype=float), kind='stable')
+    sorted_genomes = genomes[order]
+    sorted_fitness = np.asarray(fitness, dtype=float)[order]
+
+    elites = sorted_genomes[:2 + population_size % 2]
+    pairs_number = max(population_size // 2 - 1, 0)
+    if pairs_number == 0:
+        return elites.copy()
+
+    parents = fitness_based_selection(sorted_fitness, pairs_number, rng)
+    offsprings_a, offsprings_b = crossover_functions[crossover](
+        sorted_genomes[parents[:, 0]],
+        sorted_genomes[parents[:, 1]],
+        rng
+    )
+
+    # Offsprings of every pair are placed next to each other, like in run_evolution
+    offsprings = np.stack([offsprings_a, offsprings_b], axis=1).reshape(-1, genomes.shape[1])
+    offsprings = gaussian_mutation(offsprings, rng, mutation_probability, mutation_scale)
+
+    return np.concatenate([elites, offsprings])
+
+
+@profiler.timed('vectorized_evolution')
+def run_vectorized_evolution(
+        population: Population,
+        rng: t.Optional[np.random.Generator] = None,
+        crossover: str = 'uniform',
+        mutation_probability: float = 0.01,
+        mutation_scale: float = 1.0
+) -> Population:
+    """
+    Runs evolution of given population with genetic operators applied to the whole population at once.
+    Can be used instead of :func:`run_evolution`
+
+    :param population: Population to evolve
+    :param rng: Random generator (default = None, which means new generator with random seed)
+    :param crossover: Name of crossover function ('uniform', 'single_point' or 'multi_point')
+    :param mutation_probability: Probability of mutation of every gen of offsprings
+    :param mutation_scale: Standard deviation of mutation noise
+    :return: Sequence of new individuals of the next generation (with zero fitness)
+    """
+    neural_networks = [individual.neural_network for individual in population]
+    genomes = evolve_genomes(
+        population_to_matrix(neural_networks),
+        np.array([individual.fitness for individual in population]),
+        rng=rng,
+        crossover=crossover,
+        mutation_probability=mutation_probability,
+        mutation_scale=mutation_scale
+    )
+
+    return [
+        Individual(neural_network=neural_network)
+        for neural_network in matrix_to_population(genomes, neural_networks[0])
+    ]
+
+
+def create_vectorized_evolution_function(
+        crossover: str = 'uniform',
+        mutation_probability: float = 0.01,
+        mutation_scale: float = 1.0
+) -> EvolutionFunction:
+    """
+    Creates :func:`run_vectorized_evolution` with given parameters that can be used instead of :func:`run_evolution`
+    (e.g. by :class:`HeadlessRunner`). Random generator of every generation is seeded from `numpy.random`,
+    so evolution is reproducible and continues the same way after resuming from checkpoint
+
+    :param crossover: Name of crossover function ('uniform', 'single_point' or 'multi_point')
+    :param mutation_probability: Probability of mutation of every gen of offsprings
+    :param mutation_scale: Standard deviation of mutation noise
+
+    :raises ValueError: If crossover function is unknown
+    """
+    if crossover not in crossover_functions:
+        raise ValueError(f'Unknown crossover function: {crossover}. Available: {list(crossover_functions)}')
+
+    def evolve(population: Population) -> Population:
+        rng = np.random.default_rng(np.random.randint(2 ** 32, dtype=np.uint64))
+        return run_vectorized_evolution(population, rng, crossover, mutation_probability, mutation_scale)
+
+    return evolve
@@ -1,8 +1,11 @@
 import typing as t
+import copy
 
 import numpy as np
 
+from profiler import profiler
 from .layers import Layer
+from .batch import NeuralNetworkBatch
 
 
 class NeuralNetwork:
@@ -12,17 +15,62 @@ class NeuralNetwork:
         """
         self.layers = layers_sequence
         self.weighted_layers = self.layers[:-1]
+
+        # All weights and biases are stored in one contiguous buffer, layers get views of it
+        self.genome = np.empty(self.genome_size)
+        self.__bind_layers()
         self.__set_random_weights_and_biases()
 
+    @property
+    def genome_size(self) -> int:
+        """Total number of weights and biases of neural network"""
+        return sum(
+            (layer.units + 1) * next_layer.units
+            for layer, next_layer in zip(self.layers[:-1], self.layers[1:])
+        )
+
+    def __bind_layers(self) -> None:
+        """Sets weights and biases of layers as views of genome buffer"""
+        offset = 0
+        for layer, next_layer in zip(self.layers[:-1], self.layers[1:]):
+            weights_size = next_layer.units * layer.units
+            layer.weights = self.genome[offset:offset + weights_size].reshape(next_layer.units, layer.units)
+            offset += weights_size
+
+            layer.bias = self.genome[offset:offset + next_layer.units].reshape(next_layer.units, 1)
+            offset += next_layer.units
+
     def __set_random_weights_and_biases(self) -> None:
         """Sets random weights to layers of neural network"""
         for index in range(len(self.layers) - 1):
             layer = self.layers[index]
             next_layer = self.layers[index + 1]
 
-            layer.weights = np.random.normal(0.0, pow(layer.units, -0.5), (next_layer.units, layer.units))
-            layer.bias = np.random.rand(next_layer.units, 1)
+            layer.weights[...] = np.random.normal(0.0, pow(layer.units, -0.5), (next_layer.units, layer.units))
+            layer.bias[...] = np.random.rand(next_layer.units, 1)
+
+    def get_genome(self) -> np.ndarray:
+        """
+        Returns flat array with weights and biases of all layers (weights and then bias of every layer).
+        Array is not copied, so its modification changes neural network
+        """
+        return self.genome
+
+    def set_genome(self, genome: np.ndarray) -> None:
+        """
+        Copies given weights and biases into neural network
 
+        :param genome: Flat array with the same layout as :meth:`get_genome` returns
+
+        :raises ValueError: If size of genome is different
+        """
+        genome = np.asarray(genome, dtype=float).ravel()
+        if genome.size != self.genome.size:
+            raise ValueError(f'Genome must have {self.genome.size} values, got {genome.size}')
+
+        self.genome[:] = genome
+
+    @profiler.timed('neural_network.query')
     def query(self, inputs_list: t.Iterable[float]) -> np.ndarray:
         """
         Runs input data through the neural network
@@ -40,6 +88,22 @@ class NeuralNetwork:
 
         return current_array
 
+    def __getstate__(self) -> t.Dict[str, t.Any]:
+        # Views are pickled as separate arrays, so only genome is stored and views are restored after loading
+        layers = []
+        for layer in self.layers:
+            layer = copy.copy(layer)
+            layer.weights = layer.bias = None
+            layers.append(layer)
+
+        return {'layers': layers, 'genome': self.genome}
+
+    def __setstate__(self, state: t.Dict[str, t.Any]) -> None:
+        self.layers = state['layers']
+        self.weighted_layers = self.layers[:-1]
+        self.genome = state['genome']
+        self.__bind_layers()
+
     def __repr__(self):
         strings_list = []
         for index, layer in enumerate(self.layers):
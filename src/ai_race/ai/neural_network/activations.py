@@ -12,7 +12,9 @@ def _sigmoid(x: np.ndarray) -> np.ndarray:
 
 
 def _softmax(x: np.ndarray) -> np.ndarray:
-    return np.exp(x - np.max(x)) / np.exp(x - np.max(x)).sum()
+    """Softmax function. Works with both single column vector and batch of column vectors"""
+    exp = np.exp(x - np.max(x, axis=-2, keepdims=True))
+    return exp / exp.sum(axis=-2, keepdims=True)
 
 
 activation_functions = {
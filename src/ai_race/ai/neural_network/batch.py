@@ -0,0 +1,72 @@
+import typing as t
+
+import numpy as np
+
+from profiler import profiler
+
+if t.TYPE_CHECKING:
+    from . import NeuralNetwork
+
+
+class NeuralNetworkBatch:
+    """Population of neural networks with the same topology that are queried at once"""
+
+    def __init__(self, neural_networks: t.Sequence["NeuralNetwork"]):
+        """
+        :param neural_networks: Sequence of :class:`NeuralNetwork` instances with the same topology
+
+        :raises ValueError: If sequence is empty or topologies of neural networks are different
+        """
+        if not neural_networks:
+            raise ValueError('Batch must contain at least one neural network')
+
+        first_network = neural_networks[0]
+        for neural_network in neural_networks:
+            self.__check_compatibility(first_network, neural_network)
+
+        self.size = len(neural_networks)
+        self.activation_functions = [layer.activation_function for layer in first_network.weighted_layers]
+
+        # Weights have shape (networks, next layer units, layer units), biases - (networks, next layer units, 1)
+        self.weights = []
+        self.biases = []
+        for index in range(len(first_network.weighted_layers)):
+            self.weights.append(np.stack([network.layers[index].weights for network in neural_networks]))
+            self.biases.append(np.stack([network.layers[index].bias for network in neural_networks]))
+
+    @staticmethod
+    def __check_compatibility(network_a: "NeuralNetwork", network_b: "NeuralNetwork") -> None:
+        """
+        Checks that given neural networks have the same topology
+
+        :raises ValueError: If numbers of units or activation functions are different
+        """
+        units_a = [layer.units for layer in network_a.layers]
+        units_b = [layer.units for layer in network_b.layers]
+        if units_a != units_b:
+            raise ValueError(f'Neural networks must have the same layers. {units_a} != {units_b}')
+
+        for layer_a, layer_b in zip(network_a.layers, network_b.layers):
+            if layer_a.activation_function is not layer_b.activation_function:
+                raise ValueError('Neural networks must have the same activation functions')
+
+    @profiler.timed('neural_network_batch.query')
+    def query(self, inputs: np.ndarray, indices: t.Optional[t.Sequence[int]] = None) -> np.ndarray:
+        """
+        Runs input data through all neural networks of the batch
+
+        :param inputs: Numpy array with shape (networks, input units). Row `i` is passed to network `indices[i]`
+        :param indices: Indices of neural networks to query (default = None, which means all networks)
+        :return: Numpy array with shape (networks, output units)
+        """
+        current_array = np.asarray(inputs, dtype=float)[:, :, np.newaxis]
+
+        for weights, biases, activation_function in zip(self.weights, self.biases, self.activation_functions):
+            if indices is not None:
+                weights = weights[indices]
+                biases = biases[indices]
+
+            dot_product = np.matmul(weights, current_array) + biases
+            current_array = activation_function(dot_product)
+
+        return current_array[:, :, 0]
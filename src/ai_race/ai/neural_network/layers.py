@@ -36,6 +36,7 @@ class Layer(BaseLayer):
         :param activation: Name of activation function
         """
         self.units = units
+        self.activation = activation
         self.activation_function = activation_functions.get(activation, None)
 
         self.weights = weights
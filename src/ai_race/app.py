@@ -5,6 +5,8 @@ from config import Config, base_config
 from theme import Theme, DarkTheme
 from globals import context
 from camera import Camera
+from profiler import profiler
+from profiler_overlay import ProfilerOverlay
 from states.track_generator import TrackGenerator
 
 pygame.init()
@@ -27,14 +29,23 @@ class App:
         self.camera_group = Camera()
         self.manager = pygame_gui.UIManager(self.config.WINDOW_SIZE)
 
+        self.profiler_overlay = None
+        if self.config.PROFILE:
+            profiler.enable()
+            self.profiler_overlay = ProfilerOverlay(profiler, self.manager, pygame.Rect((10, 10), (360, 320)))
+
         self.is_running = True
         self.state_stack = []
-        self.dt = 0
+        self.dt = self.config.SIMULATION_STEP
+        self.time_delta = 0.0
+        self.accumulator = 0.0
 
         self.__load_states()
 
     def __get_delta_time(self) -> None:
-        self.dt = self.clock.tick(self.config.FPS) / 1000 * self.config.TARGET_FPS
+        """Ticks the clock and accumulates real time that has to be simulated (in units of simulation steps)"""
+        self.time_delta = self.clock.tick(self.config.FPS) / 1000
+        self.accumulator += self.time_delta * self.config.TARGET_FPS * self.config.SIMULATION_SPEED
 
     def __handle_events(self) -> None:
         for event in pygame.event.get():
@@ -46,8 +57,20 @@ class App:
             self.manager.process_events(event)
 
     def __update(self) -> None:
-        self.state_stack[-1].update_wrapper(self.dt)
-        self.manager.update(self.dt)
+        steps = 0
+        while self.accumulator >= self.dt and steps < self.config.MAX_STEPS_PER_FRAME:
+            self.state_stack[-1].update(self.dt)
+            self.accumulator -= self.dt
+            steps += 1
+
+        # Time that can't be simulated in this frame is dropped
+        if steps >= self.config.MAX_STEPS_PER_FRAME:
+            self.accumulator = min(self.accumulator, self.dt)
+
+        self.state_stack[-1].update_ui(self.time_delta)
+        if self.profiler_overlay is not None:
+            self.profiler_overlay.update(self.time_delta)
+        self.manager.update(self.time_delta)
 
     def __render(self):
         self.state_stack[-1].render_wrapper(self.screen)
@@ -59,14 +82,20 @@ class App:
 
     def run(self) -> None:
         while self.is_running:
-            self.clock.tick(Config.FPS)
-
             self.__get_delta_time()
-            self.__handle_events()
-            self.__update()
-            self.__render()
 
-            pygame.display.update()
+            # Waiting for the next frame isn't measured
+            with profiler.timer('frame'):
+                with profiler.timer('frame.events'):
+                    self.__handle_events()
+                with profiler.timer('frame.update'):
+                    self.__update()
+                with profiler.timer('frame.render'):
+                    self.__render()
+                with profiler.timer('frame.display'):
+                    pygame.display.update()
+
+            self.state_stack[-1].end_frame()
 
         pygame.quit()  # Quit
 
@@ -0,0 +1,334 @@
+"""
+Seeded benchmarks of hot paths of simulation, AI and track geometry.
+Results are written as JSON, so they can be compared between versions:
+
+    python benchmark.py --output results.json
+"""
+
+import typing as t
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import statistics
+from timeit import Timer
+
+import numpy as np
+import pygame
+
+from config import Config, base_config
+from theme import DarkTheme
+from globals import context
+from simulation import Simulation
+from physics.raycasting import RaycastEngine, pad_wall_indices
+from sprites.car import AICar
+from sprites.track import Track
+from utils.bezier_curve import BezierCurve
+from utils.track_builder import TrackBuilder
+from ai.neural_network import NeuralNetwork, NeuralNetworkBatch
+from ai.neural_network.layers import Layer
+from ai.genetic_algorithm import run_evolution, Individual
+from ai.genetic_algorithm.crossovers import uniform_crossover, single_point_crossover
+
+BENCHMARK_FORMAT_VERSION = 1
+
+HIDDEN_UNITS = (6, 32, 128)
+POPULATION_SIZES = (10, 25, 50)
+
+
+class BenchmarkResult(t.NamedTuple):
+    """Durations of one benchmark with certain parameters"""
+    name: str
+    parameters: t.Dict[str, t.Any]
+    durations: t.List[float]  # Duration of one call in every repeat (in seconds)
+    items: int = 1  # Number of processed items in one call (e.g. rays), used to calculate throughput
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        median = statistics.median(self.durations)
+        return {
+            'name': self.name,
+            'parameters': self.parameters,
+            'repeats': len(self.durations),
+            'best_s': min(self.durations),
+            'median_s': median,
+            'mean_s': statistics.fmean(self.durations),
+            'items': self.items,
+            'items_per_s': self.items / median if median > 0 else None
+        }
+
+
+def measure(function: t.Callable[[], t.Any], number: int, repeats: int) -> t.List[float]:
+    """
+    Measures function
+
+    :param function: Function without arguments
+    :param number: Number of calls in one repeat
+    :param repeats: Number of repeats
+    :return: Duration of one call in every repeat (in seconds)
+    """
+    return [duration / number for duration in Timer(function).repeat(repeat=repeats, number=number)]
+
+
+def seed_everything(seed: int) -> None:
+    """Seeds both random generators, so every benchmark works with the same data"""
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def create_neural_network(hidden_units: int) -> NeuralNetwork:
+    """Creates neural network with the same inputs and outputs as networks of cars"""
+    return NeuralNetwork([
+        Layer(units=7, activation='relu'),
+        Layer(units=hidden_units, activation='sigmoid'),
+        Layer(units=4),
+    ])
+
+
+def create_cars(track: Track, cars_number: int) -> t.List[AICar]:
+    """Creates AI cars placed along central curve of the track and directed along it"""
+    camera = pygame.sprite.Group()
+    central_curve = np.asarray(track.central_curve, dtype=float)
+
+    cars = []
+    for index in np.linspace(0, len(central_curve) - 2, cars_number).astype(int).tolist():
+        direction = central_curve[index + 1] - central_curve[index]
+        car = AICar(start_position=track.start_point, neural_network=create_neural_network(6), camera=camera)
+        car.position.update(*central_curve[index])
+        car.rotation = np.degrees(np.arctan2(-direction[1], direction[0]))
+        for ray in car.rays:
+            ray.update()
+        cars.append(car)
+
+    return cars
+
+
+def benchmark_raycasting(track: Track, seed: int, repeats: int) -> t.List[BenchmarkResult]:
+    seed_everything(seed)
+    results = []
+
+    # Rays of one car are cast one by one
+    car = create_cars(track, 1)[0]
+    rays = car.rays
+    durations = measure(lambda: [ray.cast(track.walls) for ray in rays], number=200, repeats=repeats)
+    results.append(BenchmarkResult('ray.cast', {'rays': len(rays)}, durations, items=len(rays)))
+
+    # Rays of all cars are cast at once (every car with walls near it), like simulation does it
+    raycast_engine = RaycastEngine(track.walls.segments)
+    for cars_number in POPULATION_SIZES:
+        cars = create_cars(track, cars_number)
+        all_rays = [ray for car in cars for ray in car.rays]
+        ray_starts = np.array([tuple(ray.start_position) for ray in all_rays])
+        ray_ends = np.array([tuple(ray.end_position) for ray in all_rays])
+
+        def cast():
+            car_wall_indices = pad_wall_indices([car.get_nearest_walls(track.walls) for car in cars])
+            wall_indices = np.repeat(car_wall_indices, [len(car.rays) for car in cars], axis=0)
+            raycast_engine.cast(ray_starts, ray_ends, wall_indices)
+
+        durations = measure(cast, number=50, repeats=repeats)
+        results.append(BenchmarkResult('raycasting.batch', {'rays': len(all_rays)}, durations, items=len(all_rays)))
+
+    return results
+
+
+def benchmark_neural_network(track: Track, seed: int, repeats: int) -> t.List[BenchmarkResult]:
+    seed_everything(seed)
+    results = []
+
+    for hidden_units in HIDDEN_UNITS:
+        neural_network = create_neural_network(hidden_units)
+        inputs = np.random.rand(7).tolist()
+        durations = measure(lambda: neural_network.query(inputs), number=2000, repeats=repeats)
+        results.append(BenchmarkResult('neural_network.query', {'hidden_units': hidden_units}, durations))
+
+        for population_size in POPULATION_SIZES:
+            batch = NeuralNetworkBatch([create_neural_network(hidden_units) for _ in range(population_size)])
+            batch_inputs = np.random.rand(population_size, 7)
+            durations = measure(lambda: batch.query(batch_inputs), number=500, repeats=repeats)
+            results.append(BenchmarkResult(
+                'neural_network_batch.query',
+                {'hidden_units': hidden_units, 'networks': population_size},
+                durations,
+                items=population_size
+            ))
+
+    return results
+
+
+def benchmark_evolution(track: Track, seed: int, repeats: int) -> t.List[BenchmarkResult]:
+    seed_everything(seed)
+    results = []
+
+    for hidden_units in HIDDEN_UNITS:
+        a = Individual(neural_network=create_neural_network(hidden_units), fitness=1.0)
+        b = Individual(neural_network=create_neural_network(hidden_units), fitness=2.0)
+        parameters = {'hidden_units': hidden_units, 'genome_size': a.neural_network.genome_size}
+
+        for name, crossover_function in (
+                ('uniform_crossover', uniform_crossover),
+                ('single_point_crossover', single_point_crossover)
+        ):
+            durations = measure(lambda: crossover_function(a, b), number=1000, repeats=repeats)
+            results.append(BenchmarkResult(name, parameters, durations))
+
+        population_size = 25
+        population = [
+            Individual(neural_network=create_neural_network(hidden_units), fitness=random.random())
+            for _ in range(population_size)
+        ]
+        durations = measure(lambda: run_evolution(population), number=20, repeats=repeats)
+        results.append(BenchmarkResult(
+            'run_evolution',
+            {**parameters, 'population_size': population_size},
+            durations,
+            items=population_size
+        ))
+
+    return results
+
+
+def benchmark_geometry(track: Track, seed: int, repeats: int) -> t.List[BenchmarkResult]:
+    seed_everything(seed)
+    results = []
+
+    for hull_points_number in (7, 50):
+        hull_points = np.random.rand(hull_points_number, 2) * 1000
+        for curve_points_number in (15, 100):
+            durations = measure(
+                lambda: BezierCurve(hull_points, curve_points_number).get_points(),
+                number=200,
+                repeats=repeats
+            )
+            results.append(BenchmarkResult(
+                'bezier_curve.get_points',
+                {'hull_points': hull_points_number, 'curve_points_number': curve_points_number},
+                durations,
+                items=hull_points_number * curve_points_number
+            ))
+
+    # Outer curve of the track before filtering (the same curve that track builder filters)
+    for interpolation_segments_number in (15, 50, 200):
+        track_builder = TrackBuilder(
+            base_config.WIDTH * 5,
+            base_config.HEIGHT * 5,
+            interpolation_segments_number=interpolation_segments_number
+        )
+        track_builder.random.seed(seed)
+        central_curve, _ = track_builder.generate_bezier_curve_points(track_builder.generate_convex_hull_points())
+        points, offsets = track_builder.get_offset_vectors(central_curve)
+        outer_curve = [tuple(point) for point in (points + offsets).tolist()]
+
+        durations = measure(lambda: track_builder.filter_curve(outer_curve), number=20, repeats=repeats)
+        results.append(BenchmarkResult('filter_curve', {'points': len(outer_curve)}, durations, items=len(outer_curve)))
+
+    return results
+
+
+def benchmark_generations(track: Track, seed: int, repeats: int, race_time: int = 5000) -> t.List[BenchmarkResult]:
+    """Measures whole headless generations: race of population and its evolution"""
+    results = []
+
+    for population_size in POPULATION_SIZES:
+        durations = []
+        car_steps = []
+        for _ in range(repeats):
+            # Every repeat races the same neural networks
+            seed_everything(seed)
+            neural_networks = [Simulation.create_neural_network() for _ in range(population_size)]
+
+            start = time.perf_counter()
+            simulation = Simulation(
+                track=track,
+                camera=pygame.sprite.Group(),
+                config=base_config,
+                race_time=race_time,
+                neural_networks=neural_networks
+            )
+            population = simulation.run_race(base_config.SIMULATION_STEP)
+            run_evolution(population)
+            durations.append(time.perf_counter() - start)
+            car_steps.append(simulation.car_steps)
+
+        results.append(BenchmarkResult(
+            'headless.generation',
+            {'population_size': population_size, 'race_time': race_time, 'car_steps': car_steps[0]},
+            durations
+        ))
+        results.append(BenchmarkResult(
+            'headless.car_step',
+            {'population_size': population_size, 'race_time': race_time},
+            [duration / steps for duration, steps in zip(durations, car_steps)]
+        ))
+
+    return results
+
+
+BenchmarkFunction = t.Callable[[Track, int, int], t.List[BenchmarkResult]]
+benchmark_functions: t.Dict[str, BenchmarkFunction] = {
+    'raycasting': benchmark_raycasting,
+    'neural_network': benchmark_neural_network,
+    'evolution': benchmark_evolution,
+    'geometry': benchmark_geometry,
+    'generations': benchmark_generations,
+}
+
+
+def run_benchmarks(
+        seed: int = 0,
+        repeats: int = 5,
+        names: t.Optional[t.Sequence[str]] = None,
+        config: Config = base_config
+) -> t.Dict[str, t.Any]:
+    """
+    Runs benchmarks on track created with given seed
+
+    :param seed: Seed of track and random generators
+    :param repeats: Number of repeats of every measurement
+    :param names: Names of benchmark groups from `benchmark_functions` (default = None, which means all groups)
+    :param config: Config object with setting of application
+    :return: Dictionary with environment and results that can be saved as JSON
+    """
+    context.setdefault('theme', DarkTheme)
+    track_builder = TrackBuilder(config.WIDTH * 5, config.HEIGHT * 5)
+    track = track_builder.create_track(seed)
+    track.build_walls(closed=False)
+
+    results = []
+    for name in names or benchmark_functions:
+        print(f'Running {name} benchmarks...', file=sys.stderr)
+        results += [result.to_dict() for result in benchmark_functions[name](track, seed, repeats)]
+
+    return {
+        'format_version': BENCHMARK_FORMAT_VERSION,
+        'seed': seed,
+        'repeats': repeats,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def main(arguments: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks of simulation, AI and geometry hot paths')
+    parser.add_argument('--seed', type=int, default=0, help='seed of track and random generators')
+    parser.add_argument('--repeats', type=int, default=5, help='number of repeats of every measurement')
+    parser.add_argument('--only', nargs='+', choices=list(benchmark_functions), help='benchmark groups to run')
+    parser.add_argument('--output', help='JSON file to write results to (standard output by default)')
+    arguments = parser.parse_args(arguments)
+
+    report = run_benchmarks(arguments.seed, arguments.repeats, arguments.only)
+    text = json.dumps(report, indent=2)
+
+    if arguments.output is None:
+        print(text)
+    else:
+        with open(arguments.output, 'w') as file:
+            file.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,18 @@
+import typing as t
+
+import numpy as np
 import pygame
 
+from physics.spatial_index import UniformGrid
+
 
 class Camera(pygame.sprite.Group):
+    """
+    Group of dynamic sprites (cars, rays) that are drawn relatively to the target.
+    Static sprites (e.g. walls) are stored separately in spatial index, so only visible ones are checked
+    """
+    STATIC_INDEX_CELL_SIZE = 512
+
     def __init__(self):
         super().__init__()
         self.display_surface = pygame.display.get_surface()
@@ -11,13 +22,46 @@ class Camera(pygame.sprite.Group):
         self.half_width = self.display_surface.get_size()[0] // 2
         self.half_height = self.display_surface.get_size()[1] // 2
 
+        self.static_sprites: t.List[pygame.sprite.Sprite] = []
+        self.static_boxes = np.empty((0, 4))
+        self.static_index: t.Optional[UniformGrid] = None
+
+    def set_static_sprites(self, sprites: t.Sequence[pygame.sprite.Sprite]) -> None:
+        """
+        Replaces static sprites. They mustn't move, because spatial index is built only once.
+        Static sprites are drawn before dynamic ones in the given order
+        """
+        self.static_sprites = list(sprites)
+        self.static_boxes = np.array(
+            [(sprite.rect.left, sprite.rect.top, sprite.rect.right, sprite.rect.bottom) for sprite in sprites],
+            dtype=float
+        ).reshape(-1, 4)
+        self.static_index = UniformGrid(self.static_boxes, self.STATIC_INDEX_CELL_SIZE)
+
     def center_target_camera(self, target: pygame.sprite.Sprite):
         self.offset.x = target.rect.centerx - self.half_width
         self.offset.y = target.rect.centery - self.half_height
 
+    def get_visible_static_sprites(self) -> t.List[pygame.sprite.Sprite]:
+        """Returns static sprites that overlap the screen (in the order they were set)"""
+        if self.static_index is None:
+            return []
+
+        min_x, min_y = self.offset.x, self.offset.y
+        max_x, max_y = min_x + self.screen_width, min_y + self.screen_height
+
+        candidates = self.static_index.query_box(min_x, min_y, max_x, max_y)
+        boxes = self.static_boxes[candidates]
+        visible = (boxes[:, 0] <= max_x) & (boxes[:, 2] >= min_x) & (boxes[:, 1] <= max_y) & (boxes[:, 3] >= min_y)
+
+        return [self.static_sprites[index] for index in candidates[visible].tolist()]
+
     def custom_draw(self, target: pygame.sprite.Sprite):
         self.center_target_camera(target)
 
+        for sprite in self.get_visible_static_sprites():
+            self.display_surface.blit(sprite.image, sprite.rect.topleft - self.offset)
+
         for sprite in self.sprites():
             offset_pos = sprite.rect.topleft - self.offset
 
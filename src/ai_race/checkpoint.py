@@ -0,0 +1,149 @@
+import typing as t
+import os
+import glob
+import random
+
+import numpy as np
+
+from sprites.track import Track
+from ai.neural_network import NeuralNetwork
+from ai.neural_network.layers import Layer
+from ai.genetic_algorithm import Individual, Population
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+class Checkpoint(t.NamedTuple):
+    """State of training after evaluation of one generation"""
+    generation: int
+    genomes: np.ndarray  # Shape (population size, genome length)
+    fitness: np.ndarray  # Shape (population size,)
+    layers: t.List[t.Tuple[int, t.Optional[str]]]  # Units and activation function of every layer
+    track: Track
+    random_state: tuple  # State of `random` module
+    numpy_random_state: tuple  # State of `numpy.random` module
+
+    def create_neural_networks(self) -> t.List[NeuralNetwork]:
+        """Creates neural networks with saved genomes. Random state is used, so it has to be restored after that"""
+        neural_networks = []
+        for genome in self.genomes:
+            neural_network = NeuralNetwork([Layer(units=units, activation=activation) for units, activation in self.layers])
+            neural_network.set_genome(genome)
+            neural_networks.append(neural_network)
+
+        return neural_networks
+
+    def get_population(self) -> Population:
+        """Creates population with saved neural networks and their fitness"""
+        return [
+            Individual(neural_network=neural_network, fitness=float(fitness))
+            for neural_network, fitness in zip(self.create_neural_networks(), self.fitness)
+        ]
+
+    def restore_random_state(self) -> None:
+        """Restores state of random generators, so evolution continues as if training wasn't interrupted"""
+        random.setstate(self.random_state)
+        np.random.set_state(self.numpy_random_state)
+
+
+def checkpoint_path(directory: str, generation: int) -> str:
+    """Returns path of checkpoint of given generation in directory"""
+    return os.path.join(directory, f'generation_{generation:05d}.npz')
+
+
+def latest_checkpoint(directory: str) -> t.Optional[str]:
+    """
+    Finds checkpoint of the last generation in directory
+
+    :return: Path of checkpoint or None if there are no checkpoints
+    """
+    paths = sorted(glob.glob(os.path.join(directory, 'generation_*.npz')))
+    return paths[-1] if paths else None
+
+
+def save_checkpoint(path: str, generation: int, population: Population, track: Track) -> None:
+    """
+    Saves evaluated population, track and state of random generators into uncompressed .npz file.
+    File is written to temporary path first and then renamed, so interrupted write doesn't corrupt checkpoint
+
+    :param path: Path of checkpoint file
+    :param generation: Number of generation
+    :param population: Evaluated population (individuals with fitness)
+    :param track: :class:`Track` instance that population was evaluated on
+    """
+    neural_networks = [individual.neural_network for individual in population]
+    layers = neural_networks[0].layers
+
+    version, internal_state, gauss_next = random.getstate()
+    _, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+
+    arrays = {
+        'format_version': np.array(CHECKPOINT_FORMAT_VERSION),
+        'generation': np.array(generation),
+        'genomes': np.stack([neural_network.get_genome() for neural_network in neural_networks]),
+        'fitness': np.array([individual.fitness for individual in population], dtype=float),
+        'layer_units': np.array([layer.units for layer in layers]),
+        'layer_activations': np.array([layer.activation or '' for layer in layers]),
+        'central_curve': np.asarray(track.central_curve, dtype=float),
+        'inner_curve': np.asarray(track.inner_curve, dtype=float),
+        'outer_curve': np.asarray(track.outer_curve, dtype=float),
+        'start_point': np.asarray(track.start_point, dtype=float),
+        'track_seed': np.array(-1 if track.seed is None else track.seed, dtype=np.int64),
+        'random_internal_state': np.array(internal_state, dtype=np.uint64),
+        'random_parameters': np.array([version, np.nan if gauss_next is None else gauss_next]),
+        'numpy_random_keys': keys,
+        'numpy_random_parameters': np.array([position, has_gauss, cached_gaussian]),
+    }
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        np.savez(file, **arrays)
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """
+    Loads checkpoint saved by :func:`save_checkpoint`
+
+    :raises ValueError: If checkpoint has unsupported format version
+    """
+    with np.load(path, allow_pickle=False) as data:
+        format_version = int(data['format_version'])
+        if format_version != CHECKPOINT_FORMAT_VERSION:
+            raise ValueError(f'Unsupported checkpoint format version: {format_version}')
+
+        version, gauss_next = data['random_parameters'].tolist()
+        position, has_gauss, cached_gaussian = data['numpy_random_parameters'].tolist()
+
+        return Checkpoint(
+            generation=int(data['generation']),
+            genomes=data['genomes'],
+            fitness=data['fitness'],
+            layers=[
+                (units, activation or None)
+                for units, activation in zip(data['layer_units'].tolist(), data['layer_activations'].tolist())
+            ],
+            track=Track(
+                central_curve=[tuple(point) for point in data['central_curve'].tolist()],
+                inner_curve=[tuple(point) for point in data['inner_curve'].tolist()],
+                outer_curve=[tuple(point) for point in data['outer_curve'].tolist()],
+                start_point=tuple(data['start_point'].tolist()),
+                seed=None if int(data['track_seed']) < 0 else int(data['track_seed'])
+            ),
+            random_state=(
+                int(version),
+                tuple(data['random_internal_state'].tolist()),
+                None if np.isnan(gauss_next) else gauss_next
+            ),
+            numpy_random_state=(
+                'MT19937',
+                data['numpy_random_keys'],
+                int(position),
+                int(has_gauss),
+                cached_gaussian
+            )
+        )
@@ -7,5 +7,16 @@ class Config:
     TARGET_FPS = 60
     DEBUG = False
 
+    # Simulation runs in fixed steps that don't depend on frame rate
+    SIMULATION_STEP = 1.0  # Delta time of one step (1.0 is one frame of TARGET_FPS)
+    SIMULATION_SPEED = 1.0  # Simulated time per real time. Values above 1 run several steps per rendered frame
+    MAX_STEPS_PER_FRAME = 10  # Limit of steps per rendered frame, so slow machine doesn't fall further behind
+
+    CHECKPOINT_DIRECTORY = None  # Directory to save population of every race to (None disables checkpoints)
+    TRACK_CACHE_DIRECTORY = None  # Directory with cached tracks (None disables cache)
+
+    PROFILE = False  # Whether to measure time of hot path phases and show it on screen
+    PROFILE_FILE = None  # File (.csv or .jsonl) to append timing statistics of every race to (None disables it)
+
 
 base_config = Config()
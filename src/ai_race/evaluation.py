@@ -0,0 +1,231 @@
+import typing as t
+import os
+import random
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
+
+from config import Config, base_config
+from theme import Theme, DarkTheme
+from globals import context
+from simulation import Simulation
+from sprites.track import Track
+from ai.neural_network import NeuralNetwork
+
+
+def evaluate_neural_networks(
+        track: Track,
+        neural_networks: t.Sequence[NeuralNetwork],
+        config: Config = base_config,
+        race_time: int = 15000
+) -> t.List[float]:
+    """
+    Simulates one race of given neural networks without display
+
+    :param track: :class:`Track` instance
+    :param neural_networks: Neural networks of AI cars
+    :param config: Config object with setting of application
+    :param race_time: Duration of the race (in milliseconds of simulated time)
+    :return: Fitness of every neural network (in the same order)
+    """
+    fitness, _ = simulate_race(track, neural_networks, config, race_time)
+    return fitness
+
+
+def simulate_race(
+        track: Track,
+        neural_networks: t.Sequence[NeuralNetwork],
+        config: Config = base_config,
+        race_time: int = 15000
+) -> t.Tuple[t.List[float], int]:
+    """
+    Same as :func:`evaluate_neural_networks`, but also returns number of car updates in the race
+
+    :return: Fitness of every neural network and number of car updates
+    """
+    simulation = Simulation(
+        track=track,
+        camera=pygame.sprite.Group(),
+        config=config,
+        race_time=race_time,
+        neural_networks=neural_networks
+    )
+    simulation.run_race(config.SIMULATION_STEP)
+
+    return simulation.get_fitness(), simulation.car_steps
+
+
+class Evaluator(ABC):
+    """Calculates fitness of neural networks of the whole population"""
+    car_steps = 0  # Number of car updates in the last evaluation (to measure throughput)
+
+    @abstractmethod
+    def evaluate(self, neural_networks: t.Sequence[NeuralNetwork]) -> t.List[float]:
+        """
+        :param neural_networks: Neural networks of the population
+        :return: Fitness of every neural network (in the same order)
+        """
+        ...
+
+    def close(self) -> None:
+        """Releases resources of evaluator"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LocalEvaluator(Evaluator):
+    """Simulates the whole population in the current process"""
+
+    def __init__(
+            self,
+            track: Track,
+            config: Config = base_config,
+            race_time: int = 15000,
+            theme: Theme = DarkTheme
+    ):
+        self.track = track
+        self.config = config
+        self.race_time = race_time
+        context.setdefault('theme', theme)
+
+    def evaluate(self, neural_networks: t.Sequence[NeuralNetwork]) -> t.List[float]:
+        fitness, self.car_steps = simulate_race(self.track, neural_networks, self.config, self.race_time)
+        return fitness
+
+
+# State of worker process of MultiTrackEvaluator
+_worker_state: t.Dict[str, t.Any] = {}
+
+
+def _init_worker(tracks: t.Sequence[Track], config: Config, race_time: int, theme: Theme) -> None:
+    """Stores data shared by all jobs of worker process, so tracks are sent to every worker only once"""
+    _worker_state['tracks'] = tracks
+    _worker_state['config'] = config
+    _worker_state['race_time'] = race_time
+    context['theme'] = theme
+
+
+def _evaluate_job(job: t.Tuple[int, int, t.Sequence[NeuralNetwork]]) -> t.Tuple[t.List[float], int]:
+    """
+    Simulates shard of population on one of the tracks of worker.
+    Random generators are seeded by the job, so result doesn't depend on the worker that takes it
+    """
+    track_index, seed, neural_networks = job
+    random.seed(seed)
+    np.random.seed(seed)
+
+    return simulate_race(
+        _worker_state['tracks'][track_index],
+        neural_networks,
+        _worker_state['config'],
+        _worker_state['race_time']
+    )
+
+
+aggregate_functions: t.Dict[str, t.Callable[..., np.ndarray]] = {
+    'mean': np.mean,
+    'min': np.min
+}
+
+
+class MultiTrackEvaluator(Evaluator):
+    """
+    Evaluates every neural network on several tracks, so champions don't overfit one layout.
+    Population is split into shards, and (shard, track) jobs are simulated in parallel worker processes
+    """
+
+    def __init__(
+            self,
+            tracks: t.Sequence[Track],
+            workers: t.Optional[int] = None,
+            aggregate: str = 'mean',
+            config: Config = base_config,
+            race_time: int = 15000,
+            theme: Theme = DarkTheme
+    ):
+        """
+        :param tracks: Sequence of :class:`Track` instances
+        :param workers: Number of worker processes (default = None, which means number of CPUs)
+        :param aggregate: Name of function that combines fitness on all tracks ('mean' or 'min')
+        :param config: Config object with setting of application
+        :param race_time: Duration of one race (in milliseconds of simulated time)
+        :param theme: Theme that sprites take colors from (DarkTheme by default)
+
+        :raises ValueError: If there are no tracks or aggregate function is unknown
+        """
+        if not tracks:
+            raise ValueError('At least one track is required')
+        if aggregate not in aggregate_functions:
+            raise ValueError(f'Unknown aggregate function: {aggregate}. Available: {list(aggregate_functions)}')
+
+        # Geometry is precomputed once here instead of in every job
+        for track in tracks:
+            if track.walls is None:
+                track.build_walls(closed=False)
+
+        self.tracks = list(tracks)
+        self.aggregate_function = aggregate_functions[aggregate]
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.tracks, config, race_time, theme)
+        )
+
+    def evaluate(self, neural_networks: t.Sequence[NeuralNetwork]) -> t.List[float]:
+        # Every track gets enough shards to keep all workers busy
+        shards_number = max(1, -(-self.workers // len(self.tracks)))
+        shards = [
+            indices for indices in np.array_split(np.arange(len(neural_networks)), shards_number)
+            if len(indices) > 0
+        ]
+
+        # Seeds of jobs are drawn from random generator of this process, so seeded (and resumed) training
+        # gets the same fitness with the same number of workers
+        jobs = []
+        job_targets = []
+        for track_index in range(len(self.tracks)):
+            for indices in shards:
+                seed = random.randrange(2 ** 32)
+                jobs.append((track_index, seed, [neural_networks[index] for index in indices]))
+                job_targets.append((track_index, indices))
+
+        # Rows are tracks, columns are neural networks
+        fitness = np.zeros((len(self.tracks), len(neural_networks)))
+        self.car_steps = 0
+        results = self.executor.map(_evaluate_job, jobs)
+        for (track_index, indices), (job_fitness, car_steps) in zip(job_targets, results):
+            fitness[track_index, indices] = job_fitness
+            self.car_steps += car_steps
+
+        return self.aggregate_function(fitness, axis=0).tolist()
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+
+class ProcessPoolEvaluator(MultiTrackEvaluator):
+    """Splits the population into shards and simulates them on one track in parallel worker processes"""
+
+    def __init__(
+            self,
+            track: Track,
+            workers: t.Optional[int] = None,
+            config: Config = base_config,
+            race_time: int = 15000,
+            theme: Theme = DarkTheme
+    ):
+        """
+        :param track: :class:`Track` instance
+        :param workers: Number of worker processes (default = None, which means number of CPUs)
+        :param config: Config object with setting of application
+        :param race_time: Duration of one race (in milliseconds of simulated time)
+        :param theme: Theme that sprites take colors from (DarkTheme by default)
+        """
+        super().__init__([track], workers, 'mean', config, race_time, theme)
@@ -0,0 +1,141 @@
+import typing as t
+import copy
+import time
+
+from config import Config, base_config
+from profiler import profiler
+from theme import Theme, DarkTheme
+from simulation import Simulation, LayersSpec
+from sprites.track import Track
+from evaluation import Evaluator, LocalEvaluator
+from checkpoint import Checkpoint, save_checkpoint, checkpoint_path
+from utils.track_builder import TrackBuilder
+from ai.genetic_algorithm import run_evolution, print_population, Individual, Population, EvolutionFunction
+
+
+class HeadlessRunner:
+    """
+    Runs races without display surface, UI managers and frame rate limit.
+    Every race is simulated as fast as CPU allows
+    """
+
+    def __init__(
+            self,
+            track: Track,
+            config: Config = base_config,
+            theme: Theme = DarkTheme,
+            cars_number: int = 25,
+            race_time: int = 15000,
+            evaluator: t.Optional[Evaluator] = None,
+            checkpoint_directory: t.Optional[str] = None,
+            layers: t.Optional[LayersSpec] = None,
+            evolution_function: EvolutionFunction = run_evolution
+    ):
+        """
+        :param track: :class:`Track` instance
+        :param config: Config object with setting of application
+        :param theme: Theme that sprites take colors from (DarkTheme by default)
+        :param cars_number: Number of cars in every race
+        :param race_time: Duration of one race (in milliseconds of simulated time)
+        :param evaluator: Evaluator of population (default = None, which means simulation in the current process)
+        :param checkpoint_directory: Directory to save checkpoint of every generation to (default = None, which
+            means no checkpoints)
+        :param layers: Units and activation function of every layer of neural networks
+            (default = None, which means `Simulation.DEFAULT_LAYERS`)
+        :param evolution_function: Function that creates the next generation from evaluated population
+            (e.g. created by :func:`create_evolution_function`)
+        """
+        self.track = track
+        self.config = config
+        self.evaluator = evaluator or LocalEvaluator(track, config, race_time, theme)
+        self.checkpoint_directory = checkpoint_directory
+        self.evolution_function = evolution_function
+        if config.PROFILE:
+            profiler.enable()
+
+        self.generation = 1
+        self.neural_networks = [Simulation.create_neural_network(layers) for _ in range(cars_number)]
+
+        # Evolution functions may reuse neural networks of population, so the best individual is stored as a copy
+        self.champion: t.Optional[Individual] = None
+        self.champion_generation = 0
+
+    def run_generation(self) -> Population:
+        """
+        Simulates one race and evolves its population
+
+        :return: Population of finished race
+        """
+        fitness = self.evaluator.evaluate(self.neural_networks)
+        population = [
+            Individual(neural_network=neural_network, fitness=individual_fitness)
+            for neural_network, individual_fitness in zip(self.neural_networks, fitness)
+        ]
+        print_population(population)
+        self.__update_champion(population)
+
+        # Saved before evolution, so resumed training draws the same random numbers
+        if self.checkpoint_directory is not None:
+            save_checkpoint(
+                checkpoint_path(self.checkpoint_directory, self.generation),
+                self.generation,
+                population,
+                self.track
+            )
+
+        next_generation = self.evolution_function(population)
+        self.neural_networks = [individual.neural_network for individual in next_generation]
+        self.save_timings()
+        self.generation += 1
+
+        return population
+
+    def save_timings(self) -> None:
+        """Appends timing statistics of the current generation to file and starts collecting new ones"""
+        if not profiler.enabled:
+            return
+
+        if self.config.PROFILE_FILE is not None:
+            profiler.dump(self.config.PROFILE_FILE, self.generation)
+        profiler.reset()
+
+    def __update_champion(self, population: Population) -> None:
+        """Stores copy of the best individual of population if it is better than the current champion"""
+        best = max(population, key=lambda individual: individual.fitness)
+        if self.champion is None or best.fitness > self.champion.fitness:
+            self.champion = Individual(neural_network=copy.deepcopy(best.neural_network), fitness=best.fitness)
+            self.champion_generation = self.generation
+
+    def resume(self, checkpoint: Checkpoint) -> None:
+        """
+        Continues training from checkpoint: saved population is evolved without being evaluated again.
+        Runner must be created with the track of checkpoint
+
+        :param checkpoint: :class:`Checkpoint` instance
+        """
+        population = checkpoint.get_population()
+        checkpoint.restore_random_state()
+
+        self.generation = checkpoint.generation
+        self.__update_champion(population)
+
+        next_generation = self.evolution_function(population)
+        self.neural_networks = [individual.neural_network for individual in next_generation]
+        self.generation += 1
+
+    def run(self, generations: int) -> None:
+        """
+        Simulates given number of generations
+
+        :param generations: Number of generations
+        """
+        for _ in range(generations):
+            start = time.perf_counter()
+            self.run_generation()
+            print(f'Generation {self.generation - 1} took {time.perf_counter() - start:.3f} s')
+
+
+if __name__ == '__main__':
+    builder = TrackBuilder(base_config.WIDTH * 5, base_config.HEIGHT * 5)
+    runner = HeadlessRunner(track=builder.create_track())
+    runner.run(generations=10)
@@ -0,0 +1,96 @@
+import typing as t
+
+import numpy as np
+
+from local_typing import Point
+
+
+def _point_to_segment_distance(
+        x: np.ndarray,
+        y: np.ndarray,
+        segments: np.ndarray
+) -> np.ndarray:
+    """
+    Calculates distances from points to segments (element-wise, coordinates of points are broadcast with segments)
+
+    :param x: X coordinates of points with shape (segments,) or any shape that can be broadcast to it
+    :param y: Y coordinates of points with the same shape as `x`
+    :param segments: Numpy array with shape (segments, 4). Every row is (x1, y1, x2, y2)
+    """
+    x1, y1, x2, y2 = segments.T
+    dx = x2 - x1
+    dy = y2 - y1
+    squared_length = dx * dx + dy * dy
+
+    # Degenerate segments are points, their projection is their start
+    projection = ((x - x1) * dx + (y - y1) * dy) / np.where(squared_length > 0, squared_length, np.inf)
+    projection = np.minimum(np.maximum(projection, 0), 1)
+
+    return np.hypot(x1 + projection * dx - x, y1 + projection * dy - y)
+
+
+def _point_to_box_distance(x: np.ndarray, y: np.ndarray, half_width: np.ndarray, half_height: np.ndarray) -> np.ndarray:
+    """Calculates distances from points to axis-aligned boxes centered at the origin"""
+    return np.hypot(np.maximum(np.abs(x) - half_width, 0), np.maximum(np.abs(y) - half_height, 0))
+
+
+def collide_rect_with_segments(
+        center: t.Union[Point, np.ndarray],
+        width: t.Union[float, np.ndarray],
+        height: t.Union[float, np.ndarray],
+        rotation: t.Union[float, np.ndarray],
+        segments: np.ndarray,
+        thickness: t.Union[float, np.ndarray]
+) -> np.ndarray:
+    """
+    Checks collision of rotated rectangle with thick segments (e.g. car with walls).
+    Rectangles of many pairs (e.g. every car with every wall near it) are checked with one call,
+    if parameters of rectangle are given as arrays with one value (or center) per segment
+
+    :param center: Center of rectangle or numpy array with shape (segments, 2)
+    :param width: Size of rectangle along its direction (or numpy array with shape (segments,))
+    :param height: Size of rectangle across its direction (or numpy array with shape (segments,))
+    :param rotation: Rotation of rectangle in degrees (counterclockwise, like `pygame.transform.rotate`)
+        (or numpy array with shape (segments,))
+    :param segments: Numpy array with shape (segments, 4). Every row is (x1, y1, x2, y2)
+    :param thickness: Thickness of all segments or numpy array with thickness of every segment
+    :return: Boolean numpy array with shape (segments,)
+    """
+    segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+    center = np.asarray(center, dtype=float)
+    half_width = np.asarray(width, dtype=float) / 2
+    half_height = np.asarray(height, dtype=float) / 2
+
+    # Moving segments to local coordinates of rectangle, where it is axis-aligned and centered at the origin
+    # (Y axis of the screen is directed downwards, so direction of rectangle is (cos, -sin))
+    rotation = np.radians(rotation)
+    cos_r, sin_r = np.cos(rotation), np.sin(rotation)
+    dx = segments[:, 0::2] - center[..., 0:1]
+    dy = segments[:, 1::2] - center[..., 1:2]
+    local_x = dx * cos_r[..., np.newaxis] - dy * sin_r[..., np.newaxis]
+    local_y = dx * sin_r[..., np.newaxis] + dy * cos_r[..., np.newaxis]
+    x1, x2 = local_x.T
+    y1, y2 = local_y.T
+
+    # Separating axis test: axes of rectangle and normal of segment
+    overlaps_x = (np.minimum(x1, x2) <= half_width) & (np.maximum(x1, x2) >= -half_width)
+    overlaps_y = (np.minimum(y1, y2) <= half_height) & (np.maximum(y1, y2) >= -half_height)
+    normal_x = y1 - y2
+    normal_y = x2 - x1
+    overlaps_normal = np.abs(normal_x * x1 + normal_y * y1) <= (
+            half_width * np.abs(normal_x) + half_height * np.abs(normal_y)
+    )
+    intersects = overlaps_x & overlaps_y & overlaps_normal
+
+    # Distance between disjoint convex shapes is reached either at endpoint of segment or at corner of rectangle.
+    # Four corners are broadcast against all segments at once (shape (4, segments))
+    distances = np.minimum(
+        _point_to_box_distance(x1, y1, half_width, half_height),
+        _point_to_box_distance(x2, y2, half_width, half_height)
+    )
+    corners_x = np.array([[1], [1], [-1], [-1]]) * half_width
+    corners_y = np.array([[1], [-1], [1], [-1]]) * half_height
+    local_segments = np.column_stack([x1, y1, x2, y2])
+    distances = np.minimum(distances, _point_to_segment_distance(corners_x, corners_y, local_segments).min(axis=0))
+
+    return intersects | (distances <= np.asarray(thickness) / 2)
@@ -0,0 +1,156 @@
+import typing as t
+
+import numpy as np
+
+from physics.spatial_index import UniformGrid
+from local_typing import Point, Curve
+
+
+class ProgressIndex:
+    """
+    Arc-length table of a curve with fast lookup of the point on curve that is the closest to given point.
+    Used to measure how far car has moved along the track
+    """
+
+    def __init__(self, curve: Curve, cell_size: float = 128, search_window: int = 8):
+        """
+        :param curve: Curve to index
+        :param cell_size: Size of a cell of spatial index over points of curve
+        :param search_window: Number of points around previous closest point that are checked first
+        """
+        self.points = np.asarray(curve, dtype=float).reshape(-1, 2)
+        self.cell_size = cell_size
+        self.search_window = search_window
+
+        # Path length from the first point of curve to every point of curve
+        segment_lengths = np.hypot(*np.diff(self.points, axis=0).T)
+        self.path_lengths = np.concatenate([[0.0], np.cumsum(segment_lengths)])
+
+        self.grid = UniformGrid(np.hstack([self.points, self.points]), cell_size)
+        self.max_radius = max(float(np.ptp(self.points[:, 0])), float(np.ptp(self.points[:, 1])), cell_size)
+        self.clearances = self.__calculate_clearances()
+
+    def to_arrays(self) -> t.Dict[str, np.ndarray]:
+        """Converts index to flat arrays (e.g. to save it into .npz file)"""
+        arrays = {
+            'points': self.points,
+            'cell_size': np.array(self.cell_size, dtype=float),
+            'search_window': np.array(self.search_window),
+            'path_lengths': self.path_lengths,
+            'clearances': self.clearances
+        }
+        arrays.update({f'grid_{key}': value for key, value in self.grid.to_arrays().items()})
+
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: t.Mapping[str, np.ndarray]) -> "ProgressIndex":
+        """Restores index from arrays created by :meth:`to_arrays` without calculating clearances again"""
+        index = cls.__new__(cls)
+        index.points = np.asarray(arrays['points'], dtype=float)
+        index.cell_size = float(arrays['cell_size'])
+        index.search_window = int(arrays['search_window'])
+        index.path_lengths = np.asarray(arrays['path_lengths'], dtype=float)
+        index.clearances = np.asarray(arrays['clearances'], dtype=float)
+        index.grid = UniformGrid.from_arrays({
+            key[len('grid_'):]: value for key, value in arrays.items() if key.startswith('grid_')
+        })
+        index.max_radius = max(
+            float(np.ptp(index.points[:, 0])),
+            float(np.ptp(index.points[:, 1])),
+            index.cell_size
+        )
+
+        return index
+
+    def __calculate_clearances(self) -> np.ndarray:
+        """
+        Calculates distance from every point of curve to the closest point that is out of its neighbourhood
+        (further than half of search window by index). Only points of the same and adjacent cells of spatial index
+        are checked, so clearances are limited by cell size. Smaller clearance is safe: search in window just
+        falls back to spatial index more often. Cells are processed in blocks to limit memory usage
+        """
+        half_window = self.search_window // 2
+        clearances = np.full(len(self.points), float(self.cell_size))
+        cells = self.grid.cells
+
+        for (cell_x, cell_y), cell_indices in cells.items():
+            neighbour_indices = np.concatenate([
+                cells[neighbour_cell]
+                for neighbour_cell in (
+                    (cell_x + offset_x, cell_y + offset_y) for offset_x in (-1, 0, 1) for offset_y in (-1, 0, 1)
+                )
+                if neighbour_cell in cells
+            ])
+            neighbours = self.points[neighbour_indices]
+
+            for start in range(0, len(cell_indices), 1024):
+                block_indices = cell_indices[start:start + 1024]
+                block = self.points[block_indices]
+                distances = np.hypot(
+                    block[:, 0][:, np.newaxis] - neighbours[:, 0],
+                    block[:, 1][:, np.newaxis] - neighbours[:, 1]
+                )
+                distances[np.abs(neighbour_indices - block_indices[:, np.newaxis]) <= half_window] = np.inf
+                clearances[block_indices] = np.minimum(distances.min(axis=1), self.cell_size)
+
+        return clearances
+
+    def __find_in_window(self, point: Point, hint: int) -> t.Optional[int]:
+        """
+        Searches closest point near the previous one
+
+        :return: Index of the closest point or None if it can't be guaranteed that there is no closer point
+            out of the window
+        """
+        start = max(hint - self.search_window, 0)
+        end = min(hint + self.search_window + 1, len(self.points))
+        distances = np.hypot(self.points[start:end, 0] - point[0], self.points[start:end, 1] - point[1])
+
+        # The last one of equally close points is taken
+        index = start + len(distances) - 1 - int(np.argmin(distances[::-1]))
+
+        # Neighbourhood of found point lies inside the window, and all other points are too far to be closer
+        if abs(index - hint) > self.search_window // 2 or distances[index - start] > self.clearances[index] / 2:
+            return None
+
+        return index
+
+    def __find_in_grid(self, point: Point) -> int:
+        """Searches closest point in spatial index, expanding searched area until the closest point is found"""
+        radius = self.cell_size
+        while True:
+            candidates = self.grid.query_circle(point, radius)
+            if len(candidates) > 0:
+                distances = np.hypot(self.points[candidates, 0] - point[0], self.points[candidates, 1] - point[1])
+                min_distance = distances.min()
+
+                if min_distance <= radius or radius >= self.max_radius:
+                    return int(candidates[distances == min_distance].max())
+
+            radius *= 2
+
+    def find_closest_index(self, point: Point, hint: t.Optional[int] = None) -> int:
+        """
+        Finds index of the point on curve that is the closest to given point
+
+        :param point: Point to search
+        :param hint: Index of the closest point found previously (e.g. on the previous frame)
+        """
+        if hint is not None:
+            index = self.__find_in_window(point, hint)
+            if index is not None:
+                return index
+
+        return self.__find_in_grid(point)
+
+    def get_path_length(self, point: Point, hint: t.Optional[int] = None) -> t.Tuple[float, int]:
+        """
+        Calculates path length from the first point on curve to the point before the closest to given
+
+        :param point: Point to search
+        :param hint: Index of the closest point found previously
+        :return: Path length and index of the closest point
+        """
+        index = self.find_closest_index(point, hint)
+        return float(self.path_lengths[max(index - 1, 0)]), index
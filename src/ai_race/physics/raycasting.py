@@ -0,0 +1,115 @@
+import typing as t
+
+import numpy as np
+
+
+def cast_rays(
+        ray_starts: np.ndarray,
+        ray_ends: np.ndarray,
+        walls: np.ndarray
+) -> t.Tuple[np.ndarray, np.ndarray]:
+    """
+    Casts all given rays in all given walls at once
+
+    :param ray_starts: Numpy array with shape (rays, 2)
+    :param ray_ends: Numpy array with shape (rays, 2)
+    :param walls: Numpy array with shape (walls, 4) with walls of all rays or with shape (rays, walls, 4)
+        with own walls of every ray (rows of NaN can be used as padding). Every row is (x1, y1, x2, y2)
+    :return: Distances to the nearest collision points with shape (rays,) (length of the ray if nothing is hit)
+        and nearest collision points with shape (rays, 2) (NaN if nothing is hit)
+    """
+    ray_starts = np.asarray(ray_starts, dtype=float).reshape(-1, 2)
+    ray_ends = np.asarray(ray_ends, dtype=float).reshape(-1, 2)
+    walls = np.asarray(walls, dtype=float)
+    if walls.ndim != 3:
+        # The same walls for all rays
+        walls = walls.reshape(1, -1, 4)
+
+    lengths = np.hypot(ray_ends[:, 0] - ray_starts[:, 0], ray_ends[:, 1] - ray_starts[:, 1])
+    distances = lengths.copy()
+    points = np.full((len(ray_starts), 2), np.nan)
+    if walls.shape[1] == 0 or len(ray_starts) == 0:
+        return distances, points
+
+    # Walls are along the second axis, rays - along the first one (walls shared by all rays are broadcast)
+    # Walls of NaN never hit, because all comparisons with NaN are false
+    x1, y1, x2, y2 = (walls[:, :, i] for i in range(4))
+    x3, y3 = ray_starts[:, 0][:, np.newaxis], ray_starts[:, 1][:, np.newaxis]
+    x4, y4 = ray_ends[:, 0][:, np.newaxis], ray_ends[:, 1][:, np.newaxis]
+
+    denominator = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    numerator = (x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_wall = numerator / denominator
+        u_ray = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denominator
+
+    hit = (denominator != 0) & (t_wall > 0) & (t_wall < 1) & (u_ray > 0)
+
+    hit_x = x1 + t_wall * (x2 - x1)
+    hit_y = y1 + t_wall * (y2 - y1)
+    hit_distances = np.where(hit, np.hypot(hit_x - x3, hit_y - y3), np.inf)
+    hit_distances[hit_distances > lengths[:, np.newaxis]] = np.inf
+
+    nearest = np.argmin(hit_distances, axis=1)
+    rows = np.arange(len(ray_starts))
+    nearest_distances = hit_distances[rows, nearest]
+    found = np.isfinite(nearest_distances)
+
+    distances[found] = nearest_distances[found]
+    points[found, 0] = hit_x[rows, nearest][found]
+    points[found, 1] = hit_y[rows, nearest][found]
+
+    return distances, points
+
+
+def pad_wall_indices(wall_indices: t.Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Stacks indices of candidate walls of several groups of rays (e.g. of cars) into one array padded with -1
+
+    :param wall_indices: Sequence of numpy arrays with indices of candidate walls of every group
+    :return: Numpy array with shape (groups, max number of candidates)
+    """
+    padded = np.full((len(wall_indices), max((len(indices) for indices in wall_indices), default=0)), -1)
+    for row, indices in zip(padded, wall_indices):
+        row[:len(indices)] = indices
+
+    return padded
+
+
+class RaycastEngine:
+    """Casts rays of all cars in walls of the track"""
+
+    def __init__(self, walls: np.ndarray):
+        """
+        :param walls: Numpy array with shape (walls, 4). Every row is (x1, y1, x2, y2)
+        """
+        self.walls = np.asarray(walls, dtype=float).reshape(-1, 4)
+        # The last row is a wall of NaN that never hits, padding of candidates (-1) points to it
+        self.padded_walls = np.vstack([self.walls, np.full((1, 4), np.nan)])
+
+    def cast(
+            self,
+            ray_starts: np.ndarray,
+            ray_ends: np.ndarray,
+            wall_indices: t.Optional[np.ndarray] = None
+    ) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        Casts rays in walls of the engine
+
+        :param ray_starts: Numpy array with shape (rays, 2)
+        :param ray_ends: Numpy array with shape (rays, 2)
+        :param wall_indices: Indices of candidate walls of all rays or numpy array with shape (rays, candidates)
+            with candidate walls of every ray padded with -1, e.g. created by :func:`pad_wall_indices`
+            (default = None, which means all walls)
+        :return: Distances to the nearest collision points with shape (rays,) (length of the ray if nothing is hit)
+            and nearest collision points with shape (rays, 2) (NaN if nothing is hit)
+        """
+        if wall_indices is None:
+            walls = self.walls
+        elif np.ndim(wall_indices) == 2:
+            walls = self.padded_walls[wall_indices]
+        else:
+            walls = self.walls[wall_indices]
+
+        return cast_rays(ray_starts, ray_ends, walls)
@@ -0,0 +1,133 @@
+import typing as t
+from math import floor
+
+import numpy as np
+
+from local_typing import Point
+
+Cell = t.Tuple[int, int]
+
+
+class UniformGrid:
+    """
+    Uniform grid over axis-aligned bounding boxes. Every cell stores indices of boxes that overlap it,
+    so cost of a query depends only on the size of queried area, not on the number of boxes
+    """
+
+    def __init__(self, boxes: np.ndarray, cell_size: float):
+        """
+        :param boxes: Numpy array with shape (boxes, 4). Every row is (min_x, min_y, max_x, max_y)
+        :param cell_size: Size of a side of one cell
+        """
+        self.cell_size = cell_size
+        self.size = len(boxes)
+
+        cells: t.Dict[Cell, t.List[int]] = {}
+        for index, (min_x, min_y, max_x, max_y) in enumerate(np.asarray(boxes, dtype=float).reshape(-1, 4)):
+            min_cell_x, min_cell_y = self.get_cell((min_x, min_y))
+            max_cell_x, max_cell_y = self.get_cell((max_x, max_y))
+
+            for cell_x in range(min_cell_x, max_cell_x + 1):
+                for cell_y in range(min_cell_y, max_cell_y + 1):
+                    cells.setdefault((cell_x, cell_y), []).append(index)
+
+        self.cells: t.Dict[Cell, np.ndarray] = {
+            cell: np.array(indices, dtype=np.int32) for cell, indices in cells.items()
+        }
+
+    @classmethod
+    def from_segments(cls, segments: np.ndarray, cell_size: float, padding: float = 0) -> "UniformGrid":
+        """
+        Creates grid over line segments
+
+        :param segments: Numpy array with shape (segments, 4). Every row is (x1, y1, x2, y2)
+        :param cell_size: Size of a side of one cell
+        :param padding: Distance that bounding box of every segment is expanded by (e.g. half of wall's thickness)
+        """
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        boxes = np.column_stack([
+            np.minimum(segments[:, 0], segments[:, 2]) - padding,
+            np.minimum(segments[:, 1], segments[:, 3]) - padding,
+            np.maximum(segments[:, 0], segments[:, 2]) + padding,
+            np.maximum(segments[:, 1], segments[:, 3]) + padding,
+        ])
+
+        return cls(boxes, cell_size)
+
+    def to_arrays(self) -> t.Dict[str, np.ndarray]:
+        """Converts grid to flat arrays (e.g. to save it into .npz file)"""
+        cells = list(self.cells.items())
+        counts = [len(indices) for _, indices in cells]
+
+        return {
+            'cell_size': np.array(self.cell_size, dtype=float),
+            'size': np.array(self.size),
+            'cell_keys': np.array([cell for cell, _ in cells], dtype=np.int64).reshape(-1, 2),
+            'cell_offsets': np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]),
+            'cell_indices': np.concatenate([indices for _, indices in cells] or [np.empty(0, dtype=np.int32)])
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: t.Mapping[str, np.ndarray]) -> "UniformGrid":
+        """Restores grid from arrays created by :meth:`to_arrays` without processing boxes again"""
+        grid = cls.__new__(cls)
+        grid.cell_size = float(arrays['cell_size'])
+        grid.size = int(arrays['size'])
+
+        offsets = arrays['cell_offsets'].tolist()
+        indices = arrays['cell_indices'].astype(np.int32)
+        grid.cells = {
+            (cell_x, cell_y): indices[offsets[index]:offsets[index + 1]]
+            for index, (cell_x, cell_y) in enumerate(arrays['cell_keys'].tolist())
+        }
+
+        return grid
+
+    def get_cell(self, point: Point) -> Cell:
+        """Returns cell that contains given point"""
+        return floor(point[0] / self.cell_size), floor(point[1] / self.cell_size)
+
+    def query_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """
+        Finds boxes that can overlap given area
+
+        :return: Sorted numpy array with unique indices of boxes (it can be shared with grid, so it mustn't be changed)
+        """
+        min_cell_x, min_cell_y = self.get_cell((min_x, min_y))
+        max_cell_x, max_cell_y = self.get_cell((max_x, max_y))
+
+        found = []
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                indices = self.cells.get((cell_x, cell_y))
+                if indices is not None:
+                    found.append(indices)
+
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        # Indices of one cell are already sorted and unique
+        if len(found) == 1:
+            return found[0]
+
+        return np.unique(np.concatenate(found))
+
+    def query_circle(self, center: Point, radius: float) -> np.ndarray:
+        """
+        Finds boxes that can overlap circle with given center and radius
+
+        :return: Sorted numpy array with unique indices of boxes
+        """
+        return self.query_box(center[0] - radius, center[1] - radius, center[0] + radius, center[1] + radius)
+
+    def query_segment(self, start: Point, end: Point, padding: float = 0) -> np.ndarray:
+        """
+        Finds boxes that can be crossed by given segment (e.g. by a ray)
+
+        :return: Sorted numpy array with unique indices of boxes
+        """
+        return self.query_box(
+            min(start[0], end[0]) - padding,
+            min(start[1], end[1]) - padding,
+            max(start[0], end[0]) + padding,
+            max(start[1], end[1]) + padding
+        )
@@ -0,0 +1,88 @@
+import typing as t
+
+import numpy as np
+
+from physics.spatial_index import UniformGrid
+from local_typing import Point
+
+
+class WallStore:
+    """
+    Geometry of all walls of the track stored as structure of arrays, with spatial index over them.
+    Walls are static, so nothing is updated after creation
+    """
+
+    def __init__(self, segments: np.ndarray, thickness: t.Union[float, np.ndarray], cell_size: float):
+        """
+        :param segments: Numpy array with shape (walls, 4). Every row is (x1, y1, x2, y2)
+        :param thickness: Thickness of all walls or numpy array with thickness of every wall
+        :param cell_size: Size of a cell of spatial index
+        """
+        self.segments = np.ascontiguousarray(segments, dtype=float).reshape(-1, 4)
+        self.thicknesses = np.broadcast_to(np.asarray(thickness, dtype=float), (len(self.segments),)).copy()
+        self.normals = self.__calculate_normals(self.segments)
+        self.index = UniformGrid.from_segments(
+            self.segments,
+            cell_size=cell_size,
+            padding=float(self.thicknesses.max(initial=0)) / 2
+        )
+
+    @staticmethod
+    def __calculate_normals(segments: np.ndarray) -> np.ndarray:
+        """Calculates unit normals of segments (zero for segments without length)"""
+        directions = segments[:, 2:] - segments[:, :2]
+        lengths = np.hypot(directions[:, 0], directions[:, 1])[:, np.newaxis]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normals = np.column_stack([directions[:, 1], -directions[:, 0]]) / lengths
+
+        return np.where(lengths > 0, normals, 0.0)
+
+    @property
+    def starts(self) -> np.ndarray:
+        """Start points of walls with shape (walls, 2). View of `self.segments`"""
+        return self.segments[:, :2]
+
+    @property
+    def ends(self) -> np.ndarray:
+        """End points of walls with shape (walls, 2). View of `self.segments`"""
+        return self.segments[:, 2:]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by geometry of walls (without spatial index)"""
+        return self.segments.nbytes + self.thicknesses.nbytes + self.normals.nbytes
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def query_circle(self, center: Point, radius: float) -> np.ndarray:
+        """
+        Finds walls that can be closer than radius to given point
+
+        :return: Sorted numpy array with unique indices of walls
+        """
+        return self.index.query_circle(center, radius)
+
+    def to_arrays(self) -> t.Dict[str, np.ndarray]:
+        """Converts store to flat arrays (e.g. to save it into .npz file)"""
+        arrays = {
+            'segments': self.segments,
+            'thicknesses': self.thicknesses
+        }
+        arrays.update({f'index_{key}': value for key, value in self.index.to_arrays().items()})
+
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: t.Mapping[str, np.ndarray]) -> "WallStore":
+        """Restores store from arrays created by :meth:`to_arrays` without building spatial index again"""
+        store = cls.__new__(cls)
+        store.segments = np.ascontiguousarray(arrays['segments'], dtype=float).reshape(-1, 4)
+        store.thicknesses = np.asarray(arrays['thicknesses'], dtype=float)
+        store.normals = cls.__calculate_normals(store.segments)
+        store.index = UniformGrid.from_arrays({
+            key[len('index_'):]: value for key, value in arrays.items() if key.startswith('index_')
+        })
+
+        return store
@@ -0,0 +1,141 @@
+import typing as t
+import os
+import csv
+import json
+import functools
+from time import perf_counter
+from contextlib import nullcontext
+from collections import defaultdict
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+STATISTICS_FIELDS = ('count', 'total_ms', 'mean_ms', *(f'p{percentile}_ms' for percentile in PERCENTILES), 'max_ms')
+
+F = t.TypeVar('F', bound=t.Callable[..., t.Any])
+
+
+class _Timer:
+    """Context manager that adds its duration to samples of profiler"""
+    __slots__ = ('samples', 'start')
+
+    def __init__(self, samples: t.List[float]):
+        self.samples = samples
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.samples.append((perf_counter() - self.start) * 1000)
+
+
+class Profiler:
+    """
+    Collects durations (in milliseconds) of named phases of the hot path.
+    Profiler is disabled by default: timers do nothing then, so instrumented code can stay in place
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.samples: t.DefaultDict[str, t.List[float]] = defaultdict(list)
+        self.__null_timer = nullcontext()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def timer(self, name: str) -> t.ContextManager:
+        """
+        Context manager that measures duration of its block
+
+        :param name: Name of measured phase (e.g. 'race.update')
+        """
+        if not self.enabled:
+            return self.__null_timer
+        return _Timer(self.samples[name])
+
+    def timed(self, name: str) -> t.Callable[[F], F]:
+        """
+        Decorator that measures duration of every call of function
+
+        :param name: Name of measured phase
+        """
+        def decorator(function: F) -> F:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+
+                start = perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.samples[name].append((perf_counter() - start) * 1000)
+
+            return t.cast(F, wrapper)
+
+        return decorator
+
+    def reset(self) -> None:
+        """Removes all collected samples"""
+        self.samples.clear()
+
+    def get_statistics(self) -> t.Dict[str, t.Dict[str, float]]:
+        """
+        Calculates statistics of every phase
+
+        :return: Dictionary {name of phase: {field from `STATISTICS_FIELDS`: value}} sorted by name
+        """
+        statistics = {}
+        for name in sorted(self.samples):
+            samples = np.asarray(self.samples[name])
+            if samples.size == 0:
+                continue
+
+            percentiles = np.percentile(samples, PERCENTILES)
+            statistics[name] = {
+                'count': int(samples.size),
+                'total_ms': float(samples.sum()),
+                'mean_ms': float(samples.mean()),
+                **{f'p{percentile}_ms': float(value) for percentile, value in zip(PERCENTILES, percentiles)},
+                'max_ms': float(samples.max())
+            }
+
+        return statistics
+
+    def dump(self, path: str, generation: int) -> None:
+        """
+        Appends statistics of collected samples to file. Format is chosen by extension:
+        `.jsonl` writes one JSON object per phase, any other extension writes CSV rows
+
+        :param path: Path of file
+        :param generation: Number of generation that samples were collected during
+        """
+        statistics = self.get_statistics()
+        if not statistics:
+            return
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if path.endswith('.jsonl'):
+            with open(path, 'a') as file:
+                for name, values in statistics.items():
+                    file.write(json.dumps({'generation': generation, 'name': name, **values}) + '\n')
+            return
+
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, 'a', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=('generation', 'name', *STATISTICS_FIELDS))
+            if write_header:
+                writer.writeheader()
+            for name, values in statistics.items():
+                writer.writerow({'generation': generation, 'name': name, **values})
+
+
+profiler = Profiler()
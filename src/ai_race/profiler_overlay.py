@@ -0,0 +1,56 @@
+import pygame
+import pygame_gui
+
+from profiler import Profiler
+
+
+class ProfilerOverlay:
+    """
+    Text box of UI manager with statistics of profiler.
+    Text is rebuilt only a few times per second, so overlay itself doesn't take noticeable frame time
+    """
+
+    def __init__(
+            self,
+            profiler: Profiler,
+            manager: pygame_gui.UIManager,
+            relative_rect: pygame.Rect,
+            refresh_interval: float = 0.5
+    ):
+        """
+        :param profiler: :class:`Profiler` instance whose statistics are shown
+        :param manager: UI manager that text box is added to
+        :param relative_rect: Position and size of text box
+        :param refresh_interval: Time between updates of text (in seconds)
+        """
+        self.profiler = profiler
+        self.refresh_interval = refresh_interval
+        self.time_since_refresh = 0.0
+        self.text_box = pygame_gui.elements.UITextBox(
+            html_text='',
+            relative_rect=relative_rect,
+            manager=manager
+        )
+
+    def get_text(self) -> str:
+        lines = ['phase: mean / p90 / max (ms)']
+        for name, values in self.profiler.get_statistics().items():
+            lines.append(f'{name}: {values["mean_ms"]:.2f} / {values["p90_ms"]:.2f} / {values["max_ms"]:.2f}')
+
+        return '<br>'.join(lines)
+
+    def update(self, time_delta: float) -> None:
+        """
+        Refreshes text if refresh interval has passed
+
+        :param time_delta: Real time since the previous frame (in seconds)
+        """
+        self.time_since_refresh += time_delta
+        if self.time_since_refresh < self.refresh_interval:
+            return
+
+        self.time_since_refresh = 0.0
+        self.text_box.set_text(self.get_text())
+
+    def kill(self) -> None:
+        self.text_box.kill()
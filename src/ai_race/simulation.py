@@ -0,0 +1,293 @@
+import typing as t
+import heapq
+from math import isnan
+
+import numpy as np
+import pygame
+from pygame.math import Vector2
+
+from config import Config
+from profiler import profiler
+from sprites.car import AICar, UserCar, CarClass
+from sprites.track import Track
+from ai.neural_network import NeuralNetwork, NeuralNetworkBatch
+from ai.neural_network.layers import Layer
+from physics.raycasting import RaycastEngine, pad_wall_indices
+from physics.collision import collide_rect_with_segments
+from ai.genetic_algorithm import run_evolution, print_population, Individual, Population
+
+
+LayersSpec = t.Sequence[t.Tuple[int, t.Optional[str]]]
+
+
+class Simulation:
+    """
+    Physics and evolution of the race. Doesn't render anything and doesn't depend on display,
+    so it is shared by :class:`Race` state and headless mode
+    """
+    DEFAULT_LAYERS: LayersSpec = ((7, 'relu'), (6, 'sigmoid'), (4, None))
+
+    def __init__(
+            self,
+            track: Track,
+            camera: pygame.sprite.Group,
+            config: Config,
+            cars_number: int = 25,
+            race_time: int = 15000,
+            add_user_car: bool = False,
+            leaderboard_size: int = 0,
+            neural_networks: t.Optional[t.Sequence[NeuralNetwork]] = None
+    ):
+        """
+        :param track: :class:`Track` instance
+        :param camera: Group that all sprites are added to
+        :param config: Config object with setting of application
+        :param cars_number: Number of cars in the first race
+        :param race_time: Duration of one race (in milliseconds of simulated time)
+        :param add_user_car: Whether to add car controlled by user
+        :param leaderboard_size: Number of leading AI cars to keep in `self.leaderboard` (default = 0)
+        :param neural_networks: Neural networks of cars in the first race (default = None, which means random ones)
+        """
+        self.track = track
+        self.camera = camera
+        self.config = config
+        self.cars = pygame.sprite.Group()
+        self.ai_cars: t.List[AICar] = []
+        self.neural_network_batch: t.Optional[NeuralNetworkBatch] = None
+        if track.walls is None:
+            track.build_walls(closed=False)
+        self.raycast_engine = RaycastEngine(track.walls.segments)
+
+        self.cars_number = cars_number
+        self.add_user_car = add_user_car
+
+        self.race_time = race_time
+        self.current_time = 0
+        self.generation = 0
+        self.car_steps = 0  # Number of car updates in the current race (e.g. to measure throughput)
+
+        self.current_population = []
+
+        # Leading cars are updated on every step, so rendering doesn't have to sort cars
+        self.leader: t.Optional[CarClass] = None
+        self.leaderboard_size = leaderboard_size
+        self.leaderboard: t.List[AICar] = []
+
+        self.start_race(neural_networks)
+
+    @classmethod
+    def create_neural_network(cls, layers: t.Optional[LayersSpec] = None) -> NeuralNetwork:
+        """
+        Creates neural network with random weights for the first race
+
+        :param layers: Units and activation function of every layer (default = None, which means `DEFAULT_LAYERS`).
+            Input layer has one unit per ray and one for velocity, output layer has 4 units
+        """
+        return NeuralNetwork([
+            Layer(units=units, activation=activation) for units, activation in layers or cls.DEFAULT_LAYERS
+        ])
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the time of current race is over or all cars have collided with walls"""
+        return self.current_time >= self.race_time or len(self.cars) <= 0
+
+    def __add_to_population(self, car: CarClass) -> None:
+        """
+        Adds car to current population
+
+        :param car: :class:`UserCar` or :class:`AICar` instance
+        """
+        if isinstance(car, AICar) and not car.destroyed:
+            fitness = car.evaluate(self.track.progress_index)
+            car.fitness = fitness
+            self.current_population.append(Individual(
+                neural_network=car.neural_network,
+                fitness=fitness
+            ))
+        car.kill()
+
+    def start_race(self, neural_networks: t.Optional[t.Sequence[NeuralNetwork]] = None) -> None:
+        """
+        Starts new race. If neural networks aren't given, population of previous race (if there is any) is evolved
+
+        :param neural_networks: Neural networks of AI cars (default = None)
+        """
+        self.current_time = 0
+        self.car_steps = 0
+        self.generation += 1
+
+        # Adding user car
+        if self.add_user_car:
+            self.cars.add(UserCar(
+                start_position=self.track.start_point,
+                camera=self.camera
+            ))
+
+        # Given neural networks
+        if neural_networks is not None:
+            neural_networks = list(neural_networks)
+
+        # First race
+        elif not self.current_population:
+            print('FIRST RACE', len(self.current_population))
+            neural_networks = [self.create_neural_network() for _ in range(self.cars_number)]
+
+        # Subsequent races
+        else:
+            print_population(self.current_population)
+            next_generation = run_evolution(self.current_population)
+            neural_networks = [individual.neural_network for individual in next_generation]
+
+        self.ai_cars = []
+        for neural_network in neural_networks:
+            car = AICar(
+                start_position=self.track.start_point,
+                neural_network=neural_network,
+                camera=self.camera
+            )
+            self.cars.add(car)
+            self.ai_cars.append(car)
+
+        # Networks don't change during the race, so they are stacked only once
+        self.neural_network_batch = NeuralNetworkBatch(neural_networks)
+        self.current_population = []
+        self.__update_leaders()
+
+    def finish_race(self) -> Population:
+        """
+        Adds all remaining cars to the current population
+
+        :return: Population of finished race
+        """
+        for car in self.cars:
+            self.__add_to_population(car)
+
+        return list(self.current_population)
+
+    def restart(self) -> None:
+        """Starts the race from the very beginning"""
+        for car in self.cars:
+            car.kill()
+        self.start_race()
+
+    def __update_cars(self, dt: float) -> None:
+        """Updates all cars. Neural networks of all AI cars are queried at once"""
+        indices = []
+        inputs = []
+        for index, car in enumerate(self.ai_cars):
+            if not car.destroyed:
+                indices.append(index)
+                inputs.append(car.get_neural_network_inputs())
+
+        if indices:
+            # Indexing copies stacked weights, so it is skipped while all cars are alive
+            batch_indices = indices if len(indices) < self.neural_network_batch.size else None
+            answers = self.neural_network_batch.query(np.array(inputs), batch_indices)
+            for index, answer in zip(indices, answers):
+                self.ai_cars[index].update(dt, answer)
+
+        for car in self.cars:
+            if not isinstance(car, AICar):
+                car.update(dt)
+
+    def step(self, dt: float) -> None:
+        """
+        Moves simulation forward
+
+        :param dt: Delta time
+        """
+        self.car_steps += len(self.cars)
+        with profiler.timer('simulation.cars'):
+            self.__update_cars(dt)
+        self.current_time += dt / self.config.TARGET_FPS * 1000
+
+        with profiler.timer('simulation.collision'):
+            self.__check_collisions()
+
+        with profiler.timer('simulation.progress'):
+            self.__update_leaders()
+
+        with profiler.timer('simulation.raycasting'):
+            self.__cast_rays()
+
+    def __check_collisions(self) -> None:
+        """
+        Removes cars that collide with walls from the race.
+        Every car is paired with walls near it and all pairs are checked at once
+        """
+        cars = self.cars.sprites()
+        nearest_walls = [car.get_nearest_walls(self.track.walls, car.collision_radius) for car in cars]
+        car_indices = np.repeat(np.arange(len(cars)), [len(wall_indices) for wall_indices in nearest_walls])
+        if len(car_indices) == 0:
+            return
+
+        wall_indices = np.concatenate(nearest_walls)
+        rects = np.array([(car.position.x, car.position.y, car.width, car.height, car.rotation) for car in cars])
+        rects = rects[car_indices]
+
+        collisions = collide_rect_with_segments(
+            center=rects[:, 0:2],
+            width=rects[:, 2],
+            height=rects[:, 3],
+            rotation=rects[:, 4],
+            segments=self.track.walls.segments[wall_indices],
+            thickness=self.track.walls.thicknesses[wall_indices]
+        )
+        colliding_cars = np.bincount(car_indices[collisions], minlength=len(cars))
+        for car, collisions_number in zip(cars, colliding_cars.tolist()):
+            if collisions_number > 0:
+                self.__add_to_population(car)
+
+    def __update_leaders(self) -> None:
+        """Updates fitness of all remaining AI cars and finds the leading ones"""
+        leader = None
+        alive_cars = []
+        for car in self.ai_cars:
+            if car.destroyed:
+                continue
+
+            car.fitness = car.evaluate(self.track.progress_index)
+            alive_cars.append(car)
+            if leader is None or car.fitness > leader.fitness:
+                leader = car
+
+        # If there are no AI cars, camera follows any other car
+        self.leader = leader if leader is not None else next(iter(self.cars), None)
+
+        if self.leaderboard_size > 0:
+            self.leaderboard = heapq.nlargest(self.leaderboard_size, alive_cars, key=lambda car: car.fitness)
+
+    def __cast_rays(self) -> None:
+        """Casts rays of all cars at once. Rays of every car are checked only with walls near that car"""
+        cars = self.cars.sprites()
+        rays = [ray for car in cars for ray in car.rays]
+        if not rays:
+            return
+
+        car_wall_indices = pad_wall_indices([car.get_nearest_walls(self.track.walls) for car in cars])
+        wall_indices = np.repeat(car_wall_indices, [len(car.rays) for car in cars], axis=0)
+
+        ray_starts = np.array([tuple(ray.start_position) for ray in rays])
+        ray_ends = np.array([tuple(ray.end_position) for ray in rays])
+        distances, points = self.raycast_engine.cast(ray_starts, ray_ends, wall_indices)
+
+        for ray, distance, point in zip(rays, distances.tolist(), points.tolist()):
+            ray.current_distance = distance
+            ray.current_point = None if isnan(point[0]) else Vector2(point)
+
+    def run_race(self, dt: float) -> Population:
+        """
+        Simulates the whole race without any delays
+
+        :param dt: Delta time of every simulation step
+        :return: Population of finished race
+        """
+        while not self.is_finished:
+            self.step(dt)
+
+        return self.finish_race()
+
+    def get_fitness(self) -> t.List[float]:
+        """Returns fitness of AI cars of current race in the same order as their neural networks"""
+        return [car.fitness for car in self.ai_cars]
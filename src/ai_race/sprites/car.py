@@ -3,14 +3,17 @@ from abc import ABC, abstractmethod
 from math import sin, cos, radians, pi, hypot
 from random import randint
 
+import numpy as np
 import pygame
 from pygame.math import Vector2
 
 from globals import context
 from ai.neural_network import NeuralNetwork
 from sprites.ray import Ray
-from sprites.wall import Wall
-from local_typing import Point, Curve
+from sprites.rotation_cache import rotation_cache
+from physics.wall_store import WallStore
+from physics.progress import ProgressIndex
+from local_typing import Point
 
 
 class AbstractCar(ABC, pygame.sprite.Sprite):
@@ -24,15 +27,14 @@ class AbstractCar(ABC, pygame.sprite.Sprite):
         self.height = 30
         self.color: pygame.Color
 
-        # Surface
-        self.original_image = pygame.Surface((self.width, self.height))
-        self.original_image.set_colorkey(pygame.Color(0, 0, 0))
-        self.original_image.fill(self.color)
-        self.image = self.original_image.copy()
-        self.image.set_colorkey(pygame.Color(0, 0, 0))
+        # Surface, rect and mask (shared by all cars of the same color)
+        self.original_image = rotation_cache.get_base_image(self.color, (self.width, self.height))
+        rotated = rotation_cache.get(self.color, (self.width, self.height), 0)
+        self.image = rotated.image
+        self.mask = rotated.mask
 
         # Rect
-        self.rect = self.image.get_rect()
+        self.rect = rotated.rect.copy()
         self.rect.center = (self.x, self.y)
 
         # Position
@@ -41,7 +43,7 @@ class AbstractCar(ABC, pygame.sprite.Sprite):
         self.start_position = Vector2(self.x, self.y) + random_offset
 
         # Collision
-        self.mask = pygame.mask.from_surface(self.image)
+        self.collision_radius = hypot(self.width, self.height) / 2
         self.destroyed = False
 
         # Movement
@@ -53,7 +55,7 @@ class AbstractCar(ABC, pygame.sprite.Sprite):
         self.deceleration = 0.3
 
         # Rays
-        self.rays = pygame.sprite.Group()
+        self.rays: t.List[Ray] = []
         self.ray_length = 300
         self.rays_number = 6
         self.view_angle = 2 * pi / 3
@@ -68,28 +70,23 @@ class AbstractCar(ABC, pygame.sprite.Sprite):
                 length=self.ray_length,
                 angle=angle,
             )
-            self.rays.add(ray)
+            self.rays.append(ray)
 
-    def draw_rays(self) -> None:
-        for ray in self.rays:
-            ray.draw()
-
-    def get_nearest_walls(self, walls: t.Iterable[Wall]) -> t.Iterable[Wall]:
-        nearest_walls = []
-        for wall in walls:
-            dx = wall.start_position[0] - self.position.x
-            dy = wall.start_position[1] - self.position.y
-            distance = hypot(dx, dy)
+    def get_nearest_walls(self, walls: WallStore, radius: t.Optional[float] = None) -> np.ndarray:
+        """
+        Finds walls that are close to the car
 
-            if distance <= self.ray_length * 1.5:
-                nearest_walls.append(wall)
+        :param walls: Walls of the track
+        :param radius: Search radius (default = None, which means the whole length of rays)
+        :return: Numpy array with indices of walls
+        """
+        if radius is None:
+            radius = self.height + self.ray_length
 
-        return nearest_walls
+        return walls.query_circle(self.position, radius)
 
     def kill(self) -> None:
         self.destroyed = True
-        for ray in self.rays:
-            ray.kill()
         super().kill()
 
     def rotate(self, dt: float, rotation_coefficient: float = 0) -> None:
@@ -101,10 +98,11 @@ class AbstractCar(ABC, pygame.sprite.Sprite):
         """
         self.rotation = (self.rotation + self.rotation_speed * rotation_coefficient * dt) % 360
 
-        new_image = pygame.transform.rotate(self.original_image, self.rotation)
+        rotated = rotation_cache.get(self.color, (self.width, self.height), self.rotation)
         old_center = self.rect.center
-        self.image = new_image
-        self.rect = self.image.get_rect()
+        self.image = rotated.image
+        self.mask = rotated.mask
+        self.rect = rotated.rect.copy()
         self.rect.center = old_center
 
     def move_forward(self, dt: float, engine_power: float = 1) -> None:
@@ -136,8 +134,8 @@ class AbstractCar(ABC, pygame.sprite.Sprite):
     @abstractmethod
     def update(self, dt: float) -> None:
         """Updates car's data"""
-        self.rays.update()
-        self.mask = pygame.mask.from_surface(self.image)
+        for ray in self.rays:
+            ray.update()
 
 
 class UserCar(AbstractCar):
@@ -171,53 +169,40 @@ class AICar(AbstractCar):
         self.color = context['theme'].AI_CAR_COLOR
         self.neural_network = neural_network
 
-        super().__init__(start_position, camera)
+        # Progress along the track (start position doesn't change, so its path length is calculated only once)
+        self.start_path_length: t.Optional[float] = None
+        self.closest_curve_index: t.Optional[int] = None
+        self.fitness = 0.0
 
-    @staticmethod
-    def __calculate_path_length_to_point_on_curve(point: Point, curve: Curve) -> float:
-        min_distance = float('inf')
-        closest_index = None
-
-        # Calculating index of point on curve that is the closest to given point
-        for index, curve_point in enumerate(curve):
-            dx = curve_point[0] - point[0]
-            dy = curve_point[1] - point[1]
-            distance = hypot(dx, dy)
-
-            if distance <= min_distance:
-                min_distance = distance
-                closest_index = index
-
-        # Calculating path length from the first point on curve to the point before closest to given
-        path_length = 0.0
-        for i in range(closest_index - 1):
-            current_point = curve[i]
-            next_point = curve[i + 1]
-            dx = next_point[0] - current_point[0]
-            dy = next_point[1] - current_point[1]
-            path_length += hypot(dx, dy)
+        super().__init__(start_position, camera)
 
+    def __calculate_path_length(self, progress_index: ProgressIndex) -> float:
+        """Calculates path length from the start of the track to the current position of the car"""
+        path_length, self.closest_curve_index = progress_index.get_path_length(
+            self.position,
+            hint=self.closest_curve_index
+        )
         return path_length
 
-    def evaluate(self, curve: Curve) -> float:
+    def evaluate(self, progress_index: ProgressIndex) -> float:
         """
-        Evaluates car's results based on its position relative to given curve.
+        Evaluates car's results based on its position relative to central curve of the track.
         Formula: (path_on_curve / 50) ^ 2
 
-        :param curve: Curve to evaluation
+        :param progress_index: :class:`ProgressIndex` of central curve of the track
         :return: Fitness coefficient
         """
-        path_length_to_start_position = self.__calculate_path_length_to_point_on_curve(self.start_position, curve)
-        path_length_to_current_position = self.__calculate_path_length_to_point_on_curve(self.position, curve)
+        if self.start_path_length is None:
+            self.start_path_length, self.closest_curve_index = progress_index.get_path_length(self.start_position)
 
-        path_length = path_length_to_current_position - path_length_to_start_position
+        path_length = self.__calculate_path_length(progress_index) - self.start_path_length
 
         if path_length < 0:
             return 0.0
 
         return (path_length / 50) ** 2
 
-    def __get_neural_network_inputs(self) -> t.List[float]:
+    def get_neural_network_inputs(self) -> t.List[float]:
         inputs = []
         for ray in self.rays:
             inputs.append(ray.current_distance / ray.length)
@@ -226,14 +211,19 @@ class AICar(AbstractCar):
 
         return inputs
 
-    def update(self, dt) -> None:
-        inputs_list = self.__get_neural_network_inputs()
-        answer = self.neural_network.query(inputs_list)
+    def update(self, dt, answer: t.Optional[np.ndarray] = None) -> None:
+        """
+        Updates car's data
+
+        :param dt: Delta time
+        :param answer: Precomputed results of car's neural network (e.g. by :class:`NeuralNetworkBatch`).
+            If not given, neural network is queried by the car itself
+        """
+        if answer is None:
+            inputs_list = self.get_neural_network_inputs()
+            answer = self.neural_network.query(inputs_list)
 
-        move_forward = answer[0][0]
-        move_backward = answer[1][0]
-        rotate_left = answer[2][0]
-        rotate_right = answer[3][0]
+        move_forward, move_backward, rotate_left, rotate_right = np.ravel(answer)
 
         moved = False
 
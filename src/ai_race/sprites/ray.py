@@ -1,94 +1,66 @@
 import typing as t
-from math import sin, cos, radians, pi, hypot
+from math import sin, cos, radians
 
-import pygame
+import numpy as np
 from pygame.math import Vector2
 
-from sprites.line_sprite import LineSprite
-from sprites.wall import Wall
+from physics.wall_store import WallStore
+from physics.raycasting import cast_rays
+from profiler import profiler
 from local_typing import Point, Radians
 
 if t.TYPE_CHECKING:
     from sprites.car import CarClass
 
 
-class Ray(LineSprite):
+class Ray:
+    """
+    Sensor of car: segment from the front of car in certain direction.
+    Ray isn't a sprite, only its endpoints are recalculated (in place) when car moves
+    """
+
     def __init__(self, car: "CarClass", length: int, angle: Radians):
+        """
+        :param car: Car that ray belongs to
+        :param length: Length of ray
+        :param angle: Angle between ray and the left border of car's view
+        """
         self.car = car
         self.length = length
         self.angle = angle
 
-        self.color = pygame.Color(200, 200, 200)
-        self.thickness = 1
-
-        super().__init__(self.car.camera)
+        self.start_position = Vector2()
+        self.end_position = Vector2()
+        self.update()
 
         self.current_distance = 0
+        self.current_point: t.Optional[Point] = None
 
-    def calculate_global_position(self):
-        car_direction = Vector2(
-            cos(radians(self.car.rotation)),
-            -sin(radians(self.car.rotation))
-        )
-        ray_direction = Vector2(
-            cos(radians(self.car.rotation) + self.angle - self.car.view_angle / 2),
-            -sin(radians(self.car.rotation) + self.angle - self.car.view_angle / 2)
-        )
+    def update(self) -> None:
+        """Recalculates start and end position of ray from position and rotation of car"""
+        car_rotation = radians(self.car.rotation)
+        ray_rotation = car_rotation + self.angle - self.car.view_angle / 2
 
-        start_position = self.car.position + car_direction * self.car.height
-        end_position = start_position + ray_direction * self.length
+        start_x = self.car.position.x + cos(car_rotation) * self.car.height
+        start_y = self.car.position.y - sin(car_rotation) * self.car.height
 
-        return start_position, end_position
+        self.start_position.update(start_x, start_y)
+        self.end_position.update(start_x + cos(ray_rotation) * self.length, start_y - sin(ray_rotation) * self.length)
 
-    def cast(self, walls: t.Iterable[Wall]) -> t.Tuple[t.Optional[Point], float]:
+    @profiler.timed('ray.cast')
+    def cast(self, walls: WallStore) -> t.Tuple[t.Optional[Point], float]:
         """
         Casts ray in given walls
         :returns: Coordinates of nearest collision point and distance to this point
         """
-        result_point = None
-        result_distance = self.length
-
-        for wall in walls:
-            collision_point, distance = self.cast_to_singe_wall(wall)
-            if collision_point and distance:
-                if distance < result_distance:
-                    result_point = collision_point
-                    result_distance = distance
-
-        return result_point, result_distance
-
-    def cast_to_singe_wall(self, wall: Wall) -> t.Union[t.Tuple[None, None], t.Tuple[Point, float]]:
-        """Casts ray in given wall"""
-        # Get start and end points of the wall
-        x1, y1 = wall.start_position
-        x2, y2 = wall.end_position
-
-        # Position of the ray
-        x3, y3 = self.start_position
-        x4, y4 = self.end_position
-
-        denominator = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
-        numerator = (x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)
-        if denominator == 0:
-            return None, None
-
-        t = numerator / denominator
-        u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denominator
-
-        if (t > 0) and (t < 1) and (u > 0):
-            x = x1 + t * (x2 - x1)
-            y = y1 + t * (y2 - y1)
-
-            distance = hypot(x - x3, y - y3)
-            if distance <= self.length:
-                coordinates = Vector2(x, y)
-                return coordinates, distance
-
-        return None, None
+        wall_indices = walls.index.query_segment(self.start_position, self.end_position)
+        distances, points = cast_rays(
+            np.array([self.start_position]),
+            np.array([self.end_position]),
+            walls.segments[wall_indices]
+        )
 
-    def update(self) -> None:
-        self.set_attributes()
+        if np.isnan(points[0][0]):
+            return None, self.length
 
-    def draw(self):
-        pygame.draw.line(self.image, self.color, self.line_start_position, self.line_end_position, self.thickness)
-        self.mask = pygame.mask.from_surface(self.image)
+        return Vector2(*points[0]), distances[0]
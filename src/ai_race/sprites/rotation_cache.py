@@ -0,0 +1,80 @@
+import typing as t
+from collections import OrderedDict
+
+import pygame
+
+from profiler import profiler
+
+Size = t.Tuple[int, int]
+ColorKey = t.Tuple[int, int, int, int]
+CacheKey = t.Tuple[ColorKey, Size, int]
+
+
+class RotationEntry(t.NamedTuple):
+    image: pygame.Surface
+    rect: pygame.Rect
+    mask: pygame.mask.Mask
+
+
+class RotationCache:
+    """
+    Cache of rotated rectangular images filled with one color, their rects and masks.
+    Rotation is quantized, so turning car is just a dictionary lookup. Least recently used entries are evicted
+    """
+
+    def __init__(self, max_size: int = 1024, angle_step: int = 1):
+        """
+        :param max_size: Maximal number of rotated images in cache
+        :param angle_step: Step of rotation quantization (in degrees)
+        """
+        self.max_size = max_size
+        self.angle_step = angle_step
+
+        self.base_images: t.Dict[t.Tuple[ColorKey, Size], pygame.Surface] = {}
+        self.entries: "OrderedDict[CacheKey, RotationEntry]" = OrderedDict()
+
+    def get_base_image(self, color: pygame.Color, size: Size) -> pygame.Surface:
+        """Returns not rotated image of given color and size. Image is shared, so it mustn't be modified"""
+        key = (tuple(color), size)
+        image = self.base_images.get(key)
+
+        if image is None:
+            image = pygame.Surface(size)
+            image.set_colorkey(pygame.Color(0, 0, 0))
+            image.fill(color)
+            self.base_images[key] = image
+
+        return image
+
+    def get(self, color: pygame.Color, size: Size, rotation: float) -> RotationEntry:
+        """
+        Returns rotated image, its rect and mask. Image and mask are shared, so they mustn't be modified
+
+        :param color: Color of image
+        :param size: Size of not rotated image
+        :param rotation: Rotation in degrees
+        """
+        angle = round(rotation / self.angle_step) * self.angle_step % 360
+        key = (tuple(color), size, angle)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+
+        with profiler.timer('rotation_cache.build'):
+            image = pygame.transform.rotate(self.get_base_image(color, size), angle)
+            entry = RotationEntry(image=image, rect=image.get_rect(), mask=pygame.mask.from_surface(image))
+
+        self.entries[key] = entry
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return entry
+
+    def clear(self) -> None:
+        self.base_images.clear()
+        self.entries.clear()
+
+
+rotation_cache = RotationCache()  # Shared by all cars
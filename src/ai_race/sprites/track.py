@@ -1,52 +1,134 @@
 import typing as t
 
+import numpy as np
 import pygame
 from pygame.surface import Surface
-from pygame.sprite import Group
 
 from globals import context
-from sprites.wall import Wall
+from sprites.track_tile import TrackTile
+from physics.wall_store import WallStore
+from physics.progress import ProgressIndex
 from local_typing import Point, Curve
 
 
 class Track:
-    def __init__(self, central_curve: Curve, inner_curve: Curve, outer_curve: Curve, start_point: Point):
+    WALL_THICKNESS = 15
+    WALL_INDEX_CELL_SIZE = 128
+
+    def __init__(
+            self,
+            central_curve: Curve,
+            inner_curve: Curve,
+            outer_curve: Curve,
+            start_point: Point,
+            seed: t.Optional[int] = None,
+            progress_index: t.Optional[ProgressIndex] = None
+    ):
+        """
+        :param central_curve: Curve in the middle of the road
+        :param inner_curve: Curve of inner walls
+        :param outer_curve: Curve of outer walls
+        :param start_point: Start position of cars
+        :param seed: Seed that track was generated with (default = None, which means unknown)
+        :param progress_index: Precomputed index of central curve (default = None, which means it is built here)
+        """
         self.central_curve = central_curve
         self.inner_curve = inner_curve
         self.outer_curve = outer_curve
         self.start_point = start_point
+        self.seed = seed
+        self.progress_index = progress_index or ProgressIndex(central_curve)
+        self.walls: t.Optional[WallStore] = None
+        self.closed_walls: t.Optional[bool] = None
+
+    def build_walls(self, closed: bool = False) -> WallStore:
+        """
+        Calculates endpoints of walls along inner and outer curves and builds spatial index over them
+        (`self.walls`). Doesn't create any sprites
 
-    def generate_walls(self, camera: Group, closed: bool = False) -> t.List[Wall]:
-        walls = []
-        inner_walls = self.__curve_to_sprites(self.inner_curve, camera)
-        outer_walls = self.__curve_to_sprites(self.outer_curve, camera)
+        :return: :class:`WallStore` instance
+        """
+        inner_curve = np.asarray(self.inner_curve, dtype=float)
+        outer_curve = np.asarray(self.outer_curve, dtype=float)
         if closed:
-            additional_walls = [
-                Wall(self.inner_curve[0], self.inner_curve[-1], camera),
-                Wall(self.outer_curve[0], self.outer_curve[-1], camera)
-            ]
+            additional_walls = np.array([
+                (*inner_curve[0], *inner_curve[-1]),
+                (*outer_curve[0], *outer_curve[-1])
+            ])
         else:
-            additional_walls = [
-                Wall(self.inner_curve[0], self.outer_curve[0], camera),
-                Wall(self.inner_curve[-1], self.outer_curve[-1], camera)
-            ]
+            additional_walls = np.array([
+                (*inner_curve[0], *outer_curve[0]),
+                (*inner_curve[-1], *outer_curve[-1])
+            ])
+
+        segments = np.vstack([
+            self.__curve_to_segments(inner_curve),
+            self.__curve_to_segments(outer_curve),
+            additional_walls
+        ])
+        self.walls = WallStore(segments, thickness=self.WALL_THICKNESS, cell_size=self.WALL_INDEX_CELL_SIZE)
+        self.closed_walls = closed
+
+        return self.walls
+
+    def generate_tiles(self, tile_size: t.Tuple[int, int], closed: bool = False) -> t.List[TrackTile]:
+        """
+        Rasterizes walls into tiles of global surface, so the whole track is drawn with a few blits.
+        Tiles without walls aren't created
+
+        :param tile_size: Size of one tile (size of the screen means that at most 4 tiles are visible at once)
+        :param closed: Whether walls are closed
+        """
+        walls = self.walls
+        if walls is None or self.closed_walls != closed:
+            walls = self.build_walls(closed)
+        segments = walls.segments
+
+        tile_width, tile_height = tile_size
+        color = context['theme'].WALL_COLOR
+        padding = int(np.ceil(walls.thicknesses.max()))
+
+        min_tile_x = int(np.floor((min(segments[:, 0].min(), segments[:, 2].min()) - padding) / tile_width))
+        min_tile_y = int(np.floor((min(segments[:, 1].min(), segments[:, 3].min()) - padding) / tile_height))
+        max_tile_x = int(np.floor((max(segments[:, 0].max(), segments[:, 2].max()) + padding) / tile_width))
+        max_tile_y = int(np.floor((max(segments[:, 1].max(), segments[:, 3].max()) + padding) / tile_height))
+
+        tiles = []
+        for tile_x in range(min_tile_x, max_tile_x + 1):
+            for tile_y in range(min_tile_y, max_tile_y + 1):
+                left, top = tile_x * tile_width, tile_y * tile_height
+                wall_indices = walls.index.query_box(
+                    left - padding, top - padding, left + tile_width + padding, top + tile_height + padding
+                )
+                if len(wall_indices) == 0:
+                    continue
+
+                # Pygame clips center line of thick line before drawing it, so walls are drawn on larger surface,
+                # otherwise walls that lie just behind the border of tile would be lost
+                padded_image = pygame.Surface((tile_width + 2 * padding, tile_height + 2 * padding))
+                origin_x, origin_y = left - padding, top - padding
+                for (x1, y1, x2, y2), thickness in zip(
+                        segments[wall_indices].tolist(),
+                        walls.thicknesses[wall_indices].tolist()
+                ):
+                    pygame.draw.line(
+                        padded_image, color,
+                        (x1 - origin_x, y1 - origin_y), (x2 - origin_x, y2 - origin_y),
+                        round(thickness)
+                    )
+
+                image = padded_image.subsurface((padding, padding, tile_width, tile_height)).copy()
+                # Tiles are mostly empty, so run-length encoding makes blitting them cheap
+                image.set_colorkey(pygame.Color(0, 0, 0), pygame.RLEACCEL)
 
-        walls.extend(inner_walls)
-        walls.extend(outer_walls)
-        walls.extend(additional_walls)
+                tiles.append(TrackTile(image, (left, top)))
 
-        return walls
+        return tiles
 
     @staticmethod
-    def __curve_to_sprites(curve: Curve, camera: Group) -> t.List[Wall]:
-        """Converts curve to array of Wall sprites"""
-        walls = []
-        for index in range(len(curve) - 1):
-            start = curve[index]
-            end = curve[index + 1]
-            walls.append(Wall(start, end, camera))
-
-        return walls
+    def __curve_to_segments(curve: np.ndarray) -> np.ndarray:
+        """Converts curve to array of segments between its neighbouring points"""
+        return np.hstack([curve[:-1], curve[1:]]).reshape(-1, 4)
 
     @staticmethod
     def __draw_curve(curve: Curve, color: pygame.Color, surface: Surface) -> None:
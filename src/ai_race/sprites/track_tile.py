@@ -0,0 +1,19 @@
+import pygame
+
+from local_typing import Point
+
+
+class TrackTile(pygame.sprite.Sprite):
+    """Static part of track (walls) pre-rendered into one surface"""
+
+    def __init__(self, image: pygame.Surface, position: Point):
+        """
+        :param image: Rendered part of track
+        :param position: Global position of top left corner of tile
+        """
+        super().__init__()
+        self.image = image
+        self.rect = image.get_rect(topleft=position)
+
+    def update(self) -> None:
+        """Tiles are static, so there is nothing to update"""
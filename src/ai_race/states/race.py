@@ -1,133 +1,110 @@
+import typing as t
+
+import numpy as np
 import pygame
 
 from globals import context
 from states.state import State
-from sprites.car import AICar, UserCar, CarClass
 from sprites.track import Track
-from ai.neural_network import NeuralNetwork
-from ai.neural_network.layers import Layer
-from ai.genetic_algorithm import run_evolution, print_population, Individual
+from simulation import Simulation
+from profiler import profiler
+from checkpoint import save_checkpoint, checkpoint_path
+from ai.genetic_algorithm import Population
 
 
 class Race(State):
+    RAY_COLOR = pygame.Color(200, 200, 200)
+
     def __init__(self, app, track: Track):
         super().__init__(app)
         self.track = track
-        self.cars = pygame.sprite.Group()
-        self.walls = pygame.sprite.Group()
-        walls = track.generate_walls(self.app.camera_group, closed=False)
-        self.walls.add(walls)
-
-        self.cars_number = 25
-        self.add_user_car = False
-
-        self.race_time = 15000
-        self.current_time = 0
-        self.last_tick = pygame.time.get_ticks()
-
-        self.current_population = []
-
-        self.__start_race()
-
-    def __add_to_population(self, car: CarClass) -> None:
-        """
-        Adds car to current population
-
-        :param car: :class:`UserCar` or :class:`AICar` instance
-        """
-        if isinstance(car, AICar) and not car.destroyed:
-            fitness = car.evaluate(self.track.central_curve)
-            self.current_population.append(Individual(
-                neural_network=car.neural_network,
-                fitness=fitness
-            ))
-        car.kill()
-
-    def __start_race(self) -> None:
-        """Starts new race"""
-        self.last_tick = pygame.time.get_ticks()
-
-        # Adding user car
-        if self.add_user_car:
-            self.cars.add(UserCar(
-                start_position=self.track.start_point,
-                camera=self.app.camera_group
-            ))
-
-        # First race
-        if not self.current_population:
-            print('FIRST RACE', len(self.current_population))
-            for i in range(self.cars_number):
-                car = AICar(
-                    start_position=self.track.start_point,
-                    neural_network=NeuralNetwork([
-                        Layer(units=7, activation='relu'),
-                        Layer(units=6, activation='sigmoid'),
-                        Layer(units=4),
-                    ]),
-                    camera=self.app.camera_group
-                )
-                self.cars.add(car)
-
-        # Subsequent races
-        else:
-            print_population(self.current_population)
-            next_generation = run_evolution(self.current_population)
-
-            for individual in next_generation:
-                car = AICar(
-                    self.track.start_point,
-                    neural_network=individual.neural_network,
-                    camera=self.app.camera_group
-                )
-                self.cars.add(car)
-
-        self.current_population = []
+        # Walls are rendered only once into tiles of screen size, so at most 4 tiles are drawn every frame.
+        # Physics uses geometry of walls from `track.walls`
+        self.app.camera_group.set_static_sprites(track.generate_tiles(self.app.config.WINDOW_SIZE, closed=False))
+        self.finished_generation: t.Optional[int] = None  # Generation whose timings aren't saved yet
+        self.simulation = Simulation(
+            track=track,
+            camera=self.app.camera_group,
+            config=self.app.config
+        )
 
     def handle_events(self, event) -> None:
         key = pygame.key.get_pressed()
 
         # Starting the race from the very beginning
         if key[pygame.K_1]:
-            for car in self.cars:
-                car.kill()
-            self.__start_race()
+            self.simulation.restart()
 
     def update(self, dt):
-        self.cars.update(dt)
-        self.walls.update()
-
-        now = pygame.time.get_ticks()
-        self.current_time = now - self.last_tick
+        with profiler.timer('race.update'):
+            self.simulation.step(dt)
+
+            if self.simulation.is_finished:
+                generation = self.simulation.generation
+                population = self.simulation.finish_race()
+                self.save_checkpoint(population)
+                self.simulation.start_race()
+                self.finished_generation = generation
+
+    def end_frame(self) -> None:
+        # Timings are saved only when timers of the frame are closed, so no sample is split between generations
+        if self.finished_generation is not None:
+            self.save_timings(self.finished_generation)
+            self.finished_generation = None
+
+    def save_timings(self, generation: int) -> None:
+        """Appends timing statistics of finished race (and evolution after it) to file and starts collecting new ones"""
+        if not profiler.enabled:
+            return
+
+        if self.app.config.PROFILE_FILE is not None:
+            profiler.dump(self.app.config.PROFILE_FILE, generation)
+        profiler.reset()
+
+    def save_checkpoint(self, population: Population) -> None:
+        """Saves population of finished race if checkpoints are enabled in config"""
+        directory = self.app.config.CHECKPOINT_DIRECTORY
+        if directory is None or not population:
+            return
+
+        generation = self.simulation.generation
+        save_checkpoint(checkpoint_path(directory, generation), generation, population, self.track)
 
-        if self.current_time >= self.race_time:
-            # Adding all remaining cars to the current population after the time expires
-            for car in self.cars:
-                self.__add_to_population(car)
+    def render(self, surface):
+        with profiler.timer('race.render'):
+            self.__render(surface)
 
-            self.__start_race()
+    def __draw_rays(self, surface: pygame.Surface) -> None:
+        """
+        Draws rays of all cars. Endpoints of all rays are collected into one array and shifted by camera offset at once.
+        Every ray of a car starts at the same point (front of the car, see :meth:`Ray.update`), so rays of a car are
+        drawn with one polyline start, end, start, end, ...: polyline goes back along every ray to the shared start
+        and draws nothing else. Cars are separate polylines, because one polyline would connect them
+        """
+        cars = self.simulation.cars
+        if not cars:
+            return
 
-    def render(self, surface):
-        surface.fill(context['theme'].BACKGROUND_COLOR)
+        points = np.array([(ray.start_position, ray.end_position) for car in cars for ray in car.rays], dtype=float)
+        points = (points - self.app.camera_group.offset).reshape(-1, 2)
 
-        sorted_cars = sorted([car for car in self.cars], key=lambda x: x.evaluate(self.track.central_curve), reverse=True)
-        self.app.camera_group.custom_draw(target=sorted_cars[0])
+        end = 0
+        for car in cars:
+            start, end = end, end + 2 * len(car.rays)
+            pygame.draw.lines(surface, self.RAY_COLOR, False, points[start:end])
 
-        for car in self.cars:
-            nearest_walls = car.get_nearest_walls(self.walls)
+    def __render(self, surface):
+        surface.fill(context['theme'].BACKGROUND_COLOR)
 
-            # Checking collision with walls
-            for wall in nearest_walls:
-                if pygame.sprite.collide_mask(car, wall):
-                    self.__add_to_population(car)
+        if self.simulation.leader is not None:
+            self.app.camera_group.custom_draw(target=self.simulation.leader)
 
-                    # All cars have collided with walls
-                    if len(self.cars) <= 0:
-                        self.__start_race()
+        # Rays are drawn only in debug mode
+        if self.app.config.DEBUG:
+            self.__draw_rays(surface)
 
-            # Raycasting
+        # Collision points of rays
+        for car in self.simulation.cars:
             for ray in car.rays:
-                point, distance = ray.cast(nearest_walls)
-                if point:
-                    ray.current_distance = distance
-                    pygame.draw.circle(surface, (254, 246, 91), point - self.app.camera_group.offset, 5)
+                if ray.current_point:
+                    pygame.draw.circle(surface, (254, 246, 91), ray.current_point - self.app.camera_group.offset, 5)
@@ -17,12 +17,20 @@ class State(ABC):
 
     @abstractmethod
     def update(self, dt: float) -> None:
-        """Updates current state"""
+        """Updates current state. Called once per fixed simulation step"""
         ...
 
-    def update_wrapper(self, dt: float) -> None:
-        self.update(dt)
-        self.local_manager.update(dt)
+    def update_ui(self, time_delta: float) -> None:
+        """
+        Updates UI of current state. Called once per rendered frame
+
+        :param time_delta: Real time since the previous frame (in seconds)
+        """
+        self.local_manager.update(time_delta)
+
+    def end_frame(self) -> None:
+        """Called once per rendered frame after the whole frame is finished (and measured by profiler)"""
+        ...
 
     @abstractmethod
     def render(self, surface: Surface) -> None:
@@ -1,6 +1,4 @@
 import typing as t
-import math
-import random
 
 import pygame
 import pygame_gui
@@ -8,25 +6,22 @@ import pygame_gui
 from globals import context
 from states.state import State
 from states.race import Race
-from sprites.track import Track
-from utils.convex_hull import ConvexHull
-from utils.bezier_curve import BezierCurve
-from utils.math import angle_between_three_points, Radians
-from local_typing import Point, Curve
+from utils.track_builder import TrackBuilder
+from utils.track_cache import TrackCache
 
 
 class TrackGenerator(State):
     def __init__(self, app):
         super().__init__(app)
-        self.track_width = 100
         self.scale = 5
-        self.random_points_number = 7
-        self.interpolation_segments_number = 15
-        self.min_segment_angle: Radians = math.pi / 2
         self.track = None
 
         self.local_width = app.config.WIDTH * self.scale
         self.local_height = app.config.HEIGHT * self.scale
+        self.track_builder = TrackBuilder(self.local_width, self.local_height)
+        self.track_cache = None
+        if app.config.TRACK_CACHE_DIRECTORY is not None:
+            self.track_cache = TrackCache(app.config.TRACK_CACHE_DIRECTORY, self.track_builder)
         self.local_surface = pygame.surface.Surface((self.local_width, self.local_height))
 
         self.recreate_track_button = pygame_gui.elements.UIButton(
@@ -38,6 +33,25 @@ class TrackGenerator(State):
             manager=self.local_manager
         )
 
+        self.seed_label = pygame_gui.elements.UILabel(
+            relative_rect=pygame.Rect(
+                (app.config.WIDTH - 170, app.config.HEIGHT - 180),
+                (160, 30)
+            ),
+            text='Seed',
+            manager=self.local_manager
+        )
+
+        # Empty seed means random track. Tracks with entered seed are loaded from cache (if it is enabled)
+        self.seed_entry = pygame_gui.elements.UITextEntryLine(
+            relative_rect=pygame.Rect(
+                (app.config.WIDTH - 170, app.config.HEIGHT - 150),
+                (160, 40)
+            ),
+            manager=self.local_manager
+        )
+        self.seed_entry.set_allowed_characters('numbers')
+
         self.start_race_button = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect(
                 (app.config.WIDTH - 170, app.config.HEIGHT - 100),
@@ -49,95 +63,20 @@ class TrackGenerator(State):
 
         self.create_track()
 
-    def generate_convex_hull_points(self) -> Curve:
-        """Creates array of points that lie on convex hull"""
-        points = []
-        for i in range(self.random_points_number):
-            x = random.randint(self.local_width * 0.15, self.local_width * 0.85)
-            y = random.randint(self.local_height * 0.15, self.local_height * 0.85)
-            points.append((x, y))
-
-        hull = ConvexHull(points)
-        hull_points = hull.get_points()
-
-        return hull_points
-
-    def generate_bezier_curve_points(self, points: Curve) -> t.Tuple[Curve, Point]:
-        """Returns interpolated path of hull points through Bezier Curves and start point"""
-        bezier_curve = BezierCurve(points=points, curve_points_number=self.interpolation_segments_number)
-        bezier_curve_points = bezier_curve.get_points()
-        start_point = bezier_curve_points[max(bezier_curve.curve_points_number // 10, 2)]
-
-        return bezier_curve_points, start_point
-
-    def filter_curve(self, curve: Curve) -> Curve:
-        """Deletes all redundant points that create too sharp angles (less than `self.min_segment_angle`)"""
-        flawless = False
-
-        while flawless is not True:
-            bad_angle_found = False
-            for index in range(len(curve) - 2):
-                p1 = curve[index]
-                p2 = curve[index + 1]
-                p3 = curve[index + 2]
-
-                if angle_between_three_points(p1, p2, p3) < self.min_segment_angle:
-                    del curve[index + 1]
-                    break
-            else:
-                if not bad_angle_found:
-                    flawless = True
-
-        return curve
-
-    def create_inner_and_outer_curves(self, central_curve: Curve) -> t.Tuple[Curve, Curve]:
-        outer_curve_points = []
-        inner_curve_points = []
-
-        for index in range(len(central_curve) - 1):
-            p1 = central_curve[index]
-            p2 = central_curve[index + 1]
-
-            dx = p2[0] - p1[0]
-            dy = p2[1] - p1[1]
-
-            alpha = math.atan2(dy, dx)
-            beta = alpha - math.pi / 2
-
-            outer_curve_points.append(
-                (
-                    p2[0] + self.track_width * math.cos(beta),
-                    p2[1] + self.track_width * math.sin(beta)
-                )
-            )
-            inner_curve_points.append(
-                (
-                    p2[0] - self.track_width * math.cos(beta),
-                    p2[1] - self.track_width * math.sin(beta)
-                )
-            )
-
-        inner_curve_points = self.filter_curve(inner_curve_points)
-        outer_curve_points = self.filter_curve(outer_curve_points)
-        return inner_curve_points, outer_curve_points
+    def get_seed(self) -> t.Optional[int]:
+        """Returns seed entered by user or None if it is empty"""
+        text = self.seed_entry.get_text().strip()
+        return int(text) if text.isdigit() else None
 
     def create_track(self) -> None:
         """Creates and displays new track"""
         self.local_surface.fill(context['theme'].BACKGROUND_COLOR)
 
-        # Hull points
-        convex_hull_points = self.generate_convex_hull_points()
-        # Bezier interpolation
-        central_curve, start_point = self.generate_bezier_curve_points(convex_hull_points)
-        # Inner and outer curves
-        inner_curve, outer_curve = self.create_inner_and_outer_curves(central_curve)
-
-        self.track = Track(
-            central_curve=central_curve,
-            inner_curve=inner_curve,
-            outer_curve=outer_curve,
-            start_point=start_point
-        )
+        seed = self.get_seed()
+        if self.track_cache is not None:
+            self.track = self.track_cache.get_track(seed)
+        else:
+            self.track = self.track_builder.create_track(seed)
         self.track.render_preview(self.local_surface, self.scale)
 
     def start_race(self) -> None:
@@ -0,0 +1,439 @@
+"""
+Hyperparameter sweep: independent training runs in a pool of worker processes.
+
+    python -m ai_race.sweep sweep.json --workers 4 --output sweep
+
+Specification is a JSON file, e.g.:
+
+    {
+        "method": "random",
+        "samples": 16,
+        "generations": 30,
+        "track_seed": 0,
+        "parameters": {
+            "mutation_probability": {"min": 0.1, "max": 0.9},
+            "mutation_number": [1, 2, 4],
+            "evolution": ["classic", "vectorized"],
+            "crossover": ["uniform", "single_point"],
+            "population": [25, 50],
+            "layers": ["7:relu,6:sigmoid,4", "7:relu,16:sigmoid,4"]
+        }
+    }
+
+Lists are choices (grid search takes all their combinations), {"min": ..., "max": ...} is a range for random search.
+Classic evolution (:func:`run_evolution`) uses `mutation_number` and `mutation_probability`, vectorized one
+(:func:`run_vectorized_evolution`) uses `gene_mutation_probability` and `mutation_scale` and also supports
+'multi_point' crossover. Every combination of listed evolutions and crossovers must be supported.
+Runs are trained in chunks of generations and resumed from checkpoints. After a grace period of generations,
+a run whose best fitness is below a low percentile of the other runs at the same generation is stopped
+after every chunk, so only clearly losing configurations are dropped. Runs whose worker fails are marked
+as failed and don't stop the sweep
+"""
+
+import typing as t
+import os
+import csv
+import json
+import time
+import random
+import shutil
+import argparse
+import itertools
+import contextlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from headless import HeadlessRunner
+from evaluation import LocalEvaluator
+from checkpoint import load_checkpoint, latest_checkpoint
+from ai.genetic_algorithm import create_evolution_function, EvolutionFunction
+from ai.genetic_algorithm.vectorized import create_vectorized_evolution_function
+from train import STATS_FIELDS, parse_layers, create_track, get_statistics
+
+DEFAULT_PARAMETERS: t.Dict[str, t.Any] = {
+    'evolution': 'classic',
+    'mutation_probability': 0.5,
+    'mutation_number': 1,
+    'gene_mutation_probability': 0.01,
+    'mutation_scale': 1.0,
+    'crossover': 'uniform',
+    'population': 25,
+    'layers': '7:relu,6:sigmoid,4'
+}
+
+RUN_FIELDS = ('run', 'status', 'generations', 'best_fitness', 'seconds', *DEFAULT_PARAMETERS, 'error')
+
+
+class SweepRun:
+    """Configuration and progress of one training run"""
+
+    def __init__(self, index: int, parameters: t.Dict[str, t.Any]):
+        self.index = index
+        self.parameters = parameters
+        self.status = 'pending'
+        self.best_fitness_curve: t.List[float] = []  # Best fitness so far after every generation
+        self.seconds = 0.0
+        self.error = ''
+
+    @property
+    def generations(self) -> int:
+        return len(self.best_fitness_curve)
+
+    @property
+    def best_fitness(self) -> float:
+        return self.best_fitness_curve[-1] if self.best_fitness_curve else 0.0
+
+    def add_statistics(self, rows: t.Sequence[t.Dict[str, t.Any]]) -> None:
+        for row in rows:
+            self.best_fitness_curve.append(max(self.best_fitness, row['max_fitness']))
+            self.seconds += row['seconds']
+
+    def to_row(self) -> t.Dict[str, t.Any]:
+        return {
+            'run': self.index,
+            'status': self.status,
+            'generations': self.generations,
+            'best_fitness': self.best_fitness,
+            'seconds': self.seconds,
+            **self.parameters,
+            'error': self.error
+        }
+
+
+def sample_parameters(specification: t.Dict[str, t.Any], seed: int) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Creates parameters of all runs from sweep specification
+
+    :raises ValueError: If specification has unknown parameters, method, ranges in grid search,
+        invalid layers or unsupported combination of evolution and crossover
+    """
+    method = specification.get('method', 'grid')
+    space = specification.get('parameters', {})
+
+    unknown = set(space) - set(DEFAULT_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unknown parameters: {sorted(unknown)}. Available: {list(DEFAULT_PARAMETERS)}')
+
+    for layers in space.get('layers', []):
+        parse_layers(layers)
+
+    # Runs with unsupported combination would fail only in workers
+    for evolution, crossover in itertools.product(
+            space.get('evolution', [DEFAULT_PARAMETERS['evolution']]),
+            space.get('crossover', [DEFAULT_PARAMETERS['crossover']])
+    ):
+        try:
+            create_run_evolution_function({**DEFAULT_PARAMETERS, 'evolution': evolution, 'crossover': crossover})
+        except ValueError as error:
+            raise ValueError(f'Unsupported evolution {evolution!r} with crossover {crossover!r}: {error}') from error
+
+    if method == 'grid':
+        if any(not isinstance(values, list) for values in space.values()):
+            raise ValueError('Grid search supports only lists of values')
+
+        names = list(space)
+        return [
+            {**DEFAULT_PARAMETERS, **dict(zip(names, values))}
+            for values in itertools.product(*(space[name] for name in names))
+        ]
+
+    if method == 'random':
+        generator = random.Random(seed)
+        runs = []
+        for _ in range(specification.get('samples', 10)):
+            parameters = dict(DEFAULT_PARAMETERS)
+            for name, values in space.items():
+                if isinstance(values, list):
+                    parameters[name] = generator.choice(values)
+                elif isinstance(values['min'], int) and isinstance(values['max'], int):
+                    parameters[name] = generator.randint(values['min'], values['max'])
+                else:
+                    parameters[name] = generator.uniform(values['min'], values['max'])
+            runs.append(parameters)
+
+        return runs
+
+    raise ValueError(f'Unknown search method: {method}. Available: grid, random')
+
+
+def create_run_evolution_function(parameters: t.Dict[str, t.Any]) -> EvolutionFunction:
+    """
+    Creates evolution function of run
+
+    :raises ValueError: If evolution or crossover function is unknown
+    """
+    if parameters['evolution'] == 'classic':
+        return create_evolution_function(
+            crossover=parameters['crossover'],
+            mutation_number=parameters['mutation_number'],
+            mutation_probability=parameters['mutation_probability']
+        )
+    if parameters['evolution'] == 'vectorized':
+        return create_vectorized_evolution_function(
+            crossover=parameters['crossover'],
+            mutation_probability=parameters['gene_mutation_probability'],
+            mutation_scale=parameters['mutation_scale']
+        )
+
+    raise ValueError(f'Unknown evolution: {parameters["evolution"]}. Available: classic, vectorized')
+
+
+def _run_chunk(
+        run_directory: str,
+        resume: bool,
+        run_seed: int,
+        parameters: t.Dict[str, t.Any],
+        track_seed: int,
+        race_time: int,
+        generations: int,
+        track_cache_directory: t.Optional[str]
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Trains run for given number of generations in worker process
+
+    :param resume: Whether to continue from the latest checkpoint of run (otherwise its checkpoints are removed)
+    :return: Statistics of every generation (rows of `stats.csv` of :mod:`train`)
+    """
+    checkpoint_directory = os.path.join(run_directory, 'checkpoints')
+    if resume:
+        checkpoint = load_checkpoint(latest_checkpoint(checkpoint_directory))
+    else:
+        shutil.rmtree(checkpoint_directory, ignore_errors=True)
+        checkpoint = None
+
+    if checkpoint is None:
+        random.seed(run_seed)
+        np.random.seed(run_seed)
+        track = create_track(track_seed, track_cache_directory)
+    else:
+        track = checkpoint.track
+
+    evaluator = LocalEvaluator(track, race_time=race_time)
+    runner = HeadlessRunner(
+        track=track,
+        cars_number=parameters['population'],
+        race_time=race_time,
+        evaluator=evaluator,
+        checkpoint_directory=checkpoint_directory,
+        layers=parse_layers(parameters['layers']),
+        evolution_function=create_run_evolution_function(parameters)
+    )
+    if checkpoint is not None:
+        runner.resume(checkpoint)
+
+    rows = []
+    # Population of every generation is printed by runner, output of workers would be mixed up
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(generations):
+            generation = runner.generation
+            start = time.perf_counter()
+            population = runner.run_generation()
+            rows.append(get_statistics(generation, population, time.perf_counter() - start, evaluator.car_steps))
+
+    return rows
+
+
+class Sweep:
+    """
+    Schedules training runs in process pool (at most `workers` runs are trained at the same time).
+    Runs are advanced in chunks, one chunk per job, so all runs reach the same generations roughly together
+    """
+
+    def __init__(
+            self,
+            runs_parameters: t.Sequence[t.Dict[str, t.Any]],
+            output_directory: str,
+            generations: int,
+            workers: int = 1,
+            chunk_generations: int = 5,
+            min_runs: int = 3,
+            grace_generations: int = 10,
+            stop_percentile: float = 25,
+            track_seed: int = 0,
+            race_time: int = 15000,
+            seed: int = 0,
+            track_cache_directory: t.Optional[str] = None
+    ):
+        """
+        :param runs_parameters: Parameters of every run (see `DEFAULT_PARAMETERS`)
+        :param output_directory: Directory for results tables and checkpoints of runs
+        :param generations: Maximal number of generations of every run
+        :param workers: Maximal number of runs trained at the same time
+        :param chunk_generations: Number of generations between checks of early stopping
+        :param min_runs: Minimal number of other runs that have to reach the same generation to stop run early
+        :param grace_generations: Number of generations that every run is trained for before it can be stopped
+        :param stop_percentile: Run is stopped if its best fitness is below this percentile (from 0 to 100)
+            of the other runs
+        :param track_seed: Seed of track of all runs
+        :param race_time: Duration of one race (in milliseconds of simulated time)
+        :param seed: Seed that random generators of every run are derived from
+        :param track_cache_directory: Directory with cached tracks (default = None, which means no cache)
+        """
+        self.runs = [SweepRun(index, parameters) for index, parameters in enumerate(runs_parameters)]
+        self.output_directory = output_directory
+        self.generations = generations
+        self.workers = workers
+        self.chunk_generations = chunk_generations
+        self.min_runs = min_runs
+        self.grace_generations = grace_generations
+        self.stop_percentile = stop_percentile
+        self.track_seed = track_seed
+        self.race_time = race_time
+        self.seed = seed
+        self.track_cache_directory = track_cache_directory
+
+    def get_run_directory(self, run: SweepRun) -> str:
+        return os.path.join(self.output_directory, 'runs', f'run_{run.index:04d}')
+
+    def get_run_seed(self, run: SweepRun) -> int:
+        return int(np.random.SeedSequence([self.seed, run.index]).generate_state(1)[0])
+
+    def should_stop(self, run: SweepRun) -> bool:
+        """
+        Whether run is clearly losing: its best fitness is below `stop_percentile` of other runs at the same
+        generation. Fitness of early generations is noisy, so runs aren't stopped during grace period
+        """
+        generation = run.generations
+        if generation < self.grace_generations:
+            return False
+
+        others = [
+            other.best_fitness_curve[generation - 1] for other in self.runs
+            if other is not run and other.generations >= generation
+        ]
+        if len(others) < self.min_runs:
+            return False
+
+        return run.best_fitness < np.percentile(others, self.stop_percentile)
+
+    def submit(self, executor: ProcessPoolExecutor, run: SweepRun) -> Future:
+        run.status = 'running'
+        return executor.submit(
+            _run_chunk,
+            self.get_run_directory(run),
+            run.generations > 0,
+            self.get_run_seed(run),
+            run.parameters,
+            self.track_seed,
+            self.race_time,
+            min(self.chunk_generations, self.generations - run.generations),
+            self.track_cache_directory
+        )
+
+    def write_runs(self) -> None:
+        """Rewrites table of all runs, so it always shows the current state of sweep"""
+        path = os.path.join(self.output_directory, 'runs.csv')
+        with open(path + '.tmp', 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=RUN_FIELDS)
+            writer.writeheader()
+            for run in sorted(self.runs, key=lambda run: run.best_fitness, reverse=True):
+                writer.writerow(run.to_row())
+        os.replace(path + '.tmp', path)
+
+    def run(self) -> t.List[SweepRun]:
+        """
+        Trains all runs
+
+        :return: Runs sorted by best fitness
+        """
+        os.makedirs(self.output_directory, exist_ok=True)
+        queue = deque(self.runs)
+        futures: t.Dict[Future, SweepRun] = {}
+
+        with open(os.path.join(self.output_directory, 'fitness.csv'), 'w', newline='') as fitness_file, \
+                ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # Fitness curves of all runs are streamed into one table as chunks finish
+            writer = csv.DictWriter(fitness_file, fieldnames=('run', *STATS_FIELDS))
+            writer.writeheader()
+
+            while queue or futures:
+                while queue and len(futures) < self.workers:
+                    run = queue.popleft()
+                    futures[self.submit(executor, run)] = run
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    run = futures.pop(future)
+                    try:
+                        rows = future.result()
+                    except Exception as error:
+                        # Configuration that can't be trained doesn't stop other runs
+                        run.status = 'failed'
+                        run.error = f'{type(error).__name__}: {error}'
+                        print(f'Run {run.index}: failed, {run.error}')
+                        continue
+
+                    run.add_statistics(rows)
+                    writer.writerows({'run': run.index, **row} for row in rows)
+                    fitness_file.flush()
+
+                    if run.generations >= self.generations:
+                        run.status = 'completed'
+                    elif self.should_stop(run):
+                        run.status = 'stopped'
+                    else:
+                        # Run continues after the others, so they reach the same generation first
+                        run.status = 'pending'
+                        queue.append(run)
+
+                    print(
+                        f'Run {run.index}: {run.status}, generation {run.generations}, '
+                        f'best fitness {run.best_fitness:.2f}'
+                    )
+
+                self.write_runs()
+
+        return sorted(self.runs, key=lambda run: run.best_fitness, reverse=True)
+
+
+def main(arguments: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Hyperparameter sweep of training')
+    parser.add_argument('specification', help='JSON file with specification of sweep')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of runs trained at once')
+    parser.add_argument('--output', default='sweep', help='directory for results and checkpoints')
+    parser.add_argument('--chunk', type=int, default=5, help='number of generations between early stopping checks')
+    parser.add_argument('--min-runs', type=int, default=3, help='number of runs to compare with to stop run early')
+    parser.add_argument('--grace', type=int, default=10, help='number of generations before runs can be stopped')
+    parser.add_argument(
+        '--stop-percentile',
+        type=float,
+        default=25,
+        help='runs below this percentile of the other runs are stopped'
+    )
+    parser.add_argument('--track-cache', help='directory with cached tracks')
+    arguments = parser.parse_args(arguments)
+
+    with open(arguments.specification) as file:
+        specification = json.load(file)
+
+    seed = specification.get('seed', 0)
+    try:
+        runs_parameters = sample_parameters(specification, seed)
+    except (ValueError, KeyError, argparse.ArgumentTypeError) as error:
+        parser.error(f'invalid specification: {error}')
+
+    sweep = Sweep(
+        runs_parameters,
+        output_directory=arguments.output,
+        generations=specification.get('generations', 20),
+        workers=max(1, arguments.workers),
+        chunk_generations=max(1, arguments.chunk),
+        min_runs=arguments.min_runs,
+        grace_generations=arguments.grace,
+        stop_percentile=arguments.stop_percentile,
+        track_seed=specification.get('track_seed', 0),
+        race_time=specification.get('race_time', 15000),
+        seed=seed,
+        track_cache_directory=arguments.track_cache
+    )
+    print(f'{len(sweep.runs)} runs, {sweep.workers} at once')
+
+    runs = sweep.run()
+    best = runs[0]
+    print(f'Best run {best.index}: fitness {best.best_fitness:.2f}, parameters {best.parameters}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Trains population without display, UI and frame rate limit:
+
+    python -m ai_race.train --seed 42 --population 50 --generations 100 --layers 7:relu,16:sigmoid,4 --workers 4
+
+Statistics of every generation are written to `<output>/stats.csv`, the best neural network of the whole training
+to `<output>/champion.npz` (checkpoint with one genome, see :func:`checkpoint.load_checkpoint`)
+"""
+
+import typing as t
+import os
+import csv
+import json
+import time
+import argparse
+import statistics
+
+from config import Config, base_config
+from simulation import Simulation, LayersSpec
+from headless import HeadlessRunner
+from evaluation import Evaluator, LocalEvaluator, ProcessPoolEvaluator
+from checkpoint import save_checkpoint
+from sprites.track import Track
+from utils.track_builder import TrackBuilder
+from utils.track_cache import TrackCache
+from ai.genetic_algorithm import Population, create_evolution_function
+from ai.genetic_algorithm.vectorized import create_vectorized_evolution_function
+from ai.neural_network.activations import activation_functions
+
+STATS_FIELDS = (
+    'generation', 'max_fitness', 'mean_fitness', 'median_fitness', 'min_fitness',
+    'seconds', 'car_steps', 'car_steps_per_s'
+)
+
+
+def parse_layers(text: str) -> LayersSpec:
+    """
+    Parses layers of neural network from text like '7:relu,6:sigmoid,4' (units and activation function).
+    Activation function of a layer is applied to its outputs, so every layer except the output one needs it,
+    and the output layer mustn't have it. Number of units in input and output layers must be the same as in
+    `Simulation.DEFAULT_LAYERS`
+
+    :raises argparse.ArgumentTypeError: If text isn't valid layer specification
+    """
+    layers = []
+    for item in text.split(','):
+        units, _, activation = item.strip().partition(':')
+        if not units.isdigit() or int(units) <= 0:
+            raise argparse.ArgumentTypeError(f'Invalid number of units: {units!r}')
+        if activation and activation not in activation_functions:
+            raise argparse.ArgumentTypeError(
+                f'Unknown activation function: {activation!r}. Available: {list(activation_functions)}'
+            )
+        layers.append((int(units), activation or None))
+
+    input_units, output_units = Simulation.DEFAULT_LAYERS[0][0], Simulation.DEFAULT_LAYERS[-1][0]
+    if len(layers) < 2 or layers[0][0] != input_units or layers[-1][0] != output_units:
+        raise argparse.ArgumentTypeError(
+            f'Neural network needs at least 2 layers, {input_units} input units and {output_units} output units'
+        )
+
+    if any(activation is None for _, activation in layers[:-1]):
+        raise argparse.ArgumentTypeError('Every layer except the output one needs activation function')
+    if layers[-1][1] is not None:
+        raise argparse.ArgumentTypeError("Output layer mustn't have activation function")
+
+    return layers
+
+
+def create_track(seed: t.Optional[int], track_cache_directory: t.Optional[str]) -> Track:
+    """Creates track with given seed (or random one) or loads it from cache"""
+    track_builder = TrackBuilder(base_config.WIDTH * 5, base_config.HEIGHT * 5)
+    if track_cache_directory is not None:
+        return TrackCache(track_cache_directory, track_builder).get_track(seed)
+
+    track = track_builder.create_track(seed)
+    track.build_walls(closed=False)
+    return track
+
+
+def get_statistics(generation: int, population: Population, seconds: float, car_steps: int) -> t.Dict[str, t.Any]:
+    """Returns row of `stats.csv` for evaluated population"""
+    fitness = [individual.fitness for individual in population]
+    return {
+        'generation': generation,
+        'max_fitness': max(fitness),
+        'mean_fitness': statistics.fmean(fitness),
+        'median_fitness': statistics.median(fitness),
+        'min_fitness': min(fitness),
+        'seconds': seconds,
+        'car_steps': car_steps,
+        'car_steps_per_s': car_steps / seconds if seconds > 0 else 0.0
+    }
+
+
+def train(
+        runner: HeadlessRunner,
+        evaluator: Evaluator,
+        generations: int,
+        output_directory: str
+) -> t.Dict[str, t.Any]:
+    """
+    Runs generations and writes statistics and champion into output directory
+
+    :return: Summary of training
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    start = time.perf_counter()
+    total_car_steps = 0
+
+    with open(os.path.join(output_directory, 'stats.csv'), 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=STATS_FIELDS)
+        writer.writeheader()
+
+        for _ in range(generations):
+            generation = runner.generation
+            generation_start = time.perf_counter()
+            population = runner.run_generation()
+            row = get_statistics(generation, population, time.perf_counter() - generation_start, evaluator.car_steps)
+
+            writer.writerow(row)
+            file.flush()
+            total_car_steps += row['car_steps']
+            print(
+                f'Generation {generation}: max fitness {row["max_fitness"]:.2f}, '
+                f'{row["seconds"]:.3f} s, {row["car_steps_per_s"]:.0f} car steps/s'
+            )
+
+    seconds = time.perf_counter() - start
+    save_checkpoint(
+        os.path.join(output_directory, 'champion.npz'),
+        runner.champion_generation,
+        [runner.champion],
+        runner.track
+    )
+
+    return {
+        'generations': generations,
+        'seconds': seconds,
+        'generations_per_s': generations / seconds if seconds > 0 else 0.0,
+        'car_steps': total_car_steps,
+        'car_steps_per_s': total_car_steps / seconds if seconds > 0 else 0.0,
+        'champion_fitness': runner.champion.fitness,
+        'champion_generation': runner.champion_generation
+    }
+
+
+def main(arguments: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Trains AI cars without display')
+    parser.add_argument('--seed', type=int, help='seed of the track (random by default)')
+    parser.add_argument('--population', type=int, default=25, help='number of cars in every race')
+    parser.add_argument('--generations', type=int, default=10, help='number of generations')
+    parser.add_argument(
+        '--layers',
+        type=parse_layers,
+        default=Simulation.DEFAULT_LAYERS,
+        help="layers of neural networks, e.g. '7:relu,6:sigmoid,4'"
+    )
+    parser.add_argument('--crossover', default='uniform', help="crossover function, e.g. 'uniform' or 'single_point'")
+    parser.add_argument(
+        '--vectorized',
+        action='store_true',
+        help="evolve the whole population at once (also supports 'multi_point' crossover)"
+    )
+    parser.add_argument('--workers', type=int, default=1, help='number of worker processes (1 means no workers)')
+    parser.add_argument('--race-time', type=int, default=15000, help='duration of one race (in milliseconds)')
+    parser.add_argument('--output', default='training', help='directory for statistics and champion')
+    parser.add_argument('--checkpoints', action='store_true', help='save checkpoint of every generation into output')
+    parser.add_argument('--track-cache', help='directory with cached tracks')
+    parser.add_argument(
+        '--profile',
+        help="file (.csv or .jsonl) to append timings of every generation to (phases of workers aren't measured)"
+    )
+    arguments = parser.parse_args(arguments)
+
+    if arguments.population < 2 or arguments.generations < 1 or arguments.workers < 1:
+        parser.error('population must be at least 2, generations and workers at least 1')
+
+    try:
+        if arguments.vectorized:
+            evolution_function = create_vectorized_evolution_function(crossover=arguments.crossover)
+        else:
+            evolution_function = create_evolution_function(crossover=arguments.crossover)
+    except ValueError as error:
+        parser.error(str(error))
+
+    track = create_track(arguments.seed, arguments.track_cache)
+    print(f'Track seed: {track.seed}')
+
+    config = Config()
+    if arguments.profile is not None:
+        config.PROFILE = True
+        config.PROFILE_FILE = arguments.profile
+
+    if arguments.workers > 1:
+        evaluator = ProcessPoolEvaluator(track, arguments.workers, config, arguments.race_time)
+    else:
+        evaluator = LocalEvaluator(track, config, arguments.race_time)
+
+    with evaluator:
+        runner = HeadlessRunner(
+            track=track,
+            config=config,
+            cars_number=arguments.population,
+            race_time=arguments.race_time,
+            evaluator=evaluator,
+            checkpoint_directory=os.path.join(arguments.output, 'checkpoints') if arguments.checkpoints else None,
+            layers=arguments.layers,
+            evolution_function=evolution_function
+        )
+        summary = train(runner, evaluator, arguments.generations, arguments.output)
+
+    summary['track_seed'] = track.seed
+    with open(os.path.join(arguments.output, 'summary.json'), 'w') as file:
+        json.dump(summary, file, indent=2)
+
+    print(
+        f'{summary["generations_per_s"]:.3f} generations/s, {summary["car_steps_per_s"]:.0f} car steps/s, '
+        f'champion fitness {summary["champion_fitness"]:.2f} (generation {summary["champion_generation"]})'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,26 @@ Source: https://github.com/thestarvanisher/bezier_curve_interpolation
 """
 
 import typing as t
+from functools import lru_cache
 
 import numpy as np
 
 from local_typing import Point, Curve
 
 
+@lru_cache(maxsize=32)
+def get_cubic_basis(curve_points_number: int) -> np.ndarray:
+    """
+    Returns Bernstein basis of cubic Bezier curve sampled at `curve_points_number` evenly spaced parameters.
+    Matrix has shape (curve_points_number, 4) and is shared, so it is read-only
+    """
+    j = np.linspace(0, 1, curve_points_number)[:, np.newaxis]
+    basis = np.hstack([(1 - j) ** 3, 3 * j * (1 - j) ** 2, 3 * (1 - j) * j ** 2, j ** 3])
+    basis.setflags(write=False)
+
+    return basis
+
+
 class BezierCurve:
     def __init__(self, points: t.List[Point], curve_points_number=30):
         """
@@ -23,7 +37,6 @@ class BezierCurve:
         self.curve_points = None
         self.A = None
         self.B = None
-        self.C = None
         self.P = None
 
         self.__fix_variables()
@@ -33,60 +46,43 @@ class BezierCurve:
         if type(self.points) != np.ndarray:
             self.points = np.array(self.points)
 
-    def __create_coefficient_matrix(self) -> None:
-        """Creates the coefficient matrix for the Bezier curve interpolation"""
-        C = np.zeros((self.n, self.n))
-
-        for i in range(self.n):
-            r = i + 1 if i + 1 < self.n else (i + 1) % self.n
-            row = np.zeros(self.n)
-            row[i], row[r] = 1, 2
-            C[i] = row
-
-        self.C = C
-
     def __create_endpoint_vector(self) -> None:
         """Creates the column vector which contains the end points of each curve connecting two points"""
-        P = np.zeros((self.n, 2))
+        self.P = 2 * np.roll(self.points, -1, axis=0) + np.roll(self.points, -2, axis=0)
 
-        for i in range(self.n):
-            l = i + 1 if i + 1 < self.n else (i + 1) % self.n
-            r = i + 2 if i + 2 < self.n else (i + 2) % self.n
+    def __solve_cyclic_system(self) -> np.ndarray:
+        """
+        Solves A[i] + 2 * A[i + 1] = P[i] (indices are cyclic) in O(n).
+        Every A[k] is expressed as offsets[k] + factors[k] * A[0] going forward, where error is halved on every step.
+        Then A[0] is found from the equation that closes the cycle
+        """
+        offsets = np.zeros_like(self.P, dtype=float)
+        for k in range(self.n - 1):
+            offsets[k + 1] = (self.P[k] - offsets[k]) / 2
+        factors = (-0.5) ** np.arange(self.n)
 
-            val = 2 * self.points[l] + self.points[r]
-            P[i] = val
+        first = (self.P[-1] - offsets[-1]) / (2 + factors[-1])
 
-        self.P = P
+        return offsets + factors[:, np.newaxis] * first
 
     def __find_control_points(self) -> None:
         """Find the control points for the Bezier curve"""
-        A = np.linalg.solve(self.C, self.P)
-        B = np.zeros_like(A)
-
-        for i in range(self.n):
-            l = i + 1 if i + 1 < self.n else (i + 1) % self.n
-            B[i] = 2 * self.points[l] - A[l]
+        A = self.__solve_cyclic_system()
+        B = 2 * np.roll(self.points, -1, axis=0) - np.roll(A, -1, axis=0)
 
         self.A = A
         self.B = B
 
     def find_points(self) -> None:
         """Finds the points on the smooth curve"""
-        self.__create_coefficient_matrix()
         self.__create_endpoint_vector()
         self.__find_control_points()
 
-        all_points = []
-
-        for i in range(self.n):
-            next_i = i + 1 if i + 1 < self.n else (i + 1) % self.n
-            dpts = np.linspace(0, 1, self.curve_points_number)
-            for j in dpts:
-                pt = np.power(1 - j, 3) * self.points[i] + 3 * j * np.power(1 - j, 2) * self.A[i] + 3 * (
-                        1 - j) * np.power(j, 2) * self.B[i] + np.power(j, 3) * self.points[next_i]
-                all_points.append(pt.tolist())
+        # Control points of every segment have shape (n, 4, 2), all segments are evaluated with one matmul
+        control_points = np.stack([self.points, self.A, self.B, np.roll(self.points, -1, axis=0)], axis=1)
+        curve_points = np.matmul(get_cubic_basis(self.curve_points_number), control_points)
 
-        self.curve_points = np.array(all_points)
+        self.curve_points = curve_points.reshape(-1, 2)
 
     def get_points(self) -> Curve:
         """Return the points on the curve. If they haven't been computed, compute them"""
@@ -10,3 +10,17 @@ def angle_between_three_points(p1: Point, p2: Point, p3: Point) -> Radians:
     c = math.sqrt((p1[0] - p3[0]) ** 2 + (p1[1] - p3[1]) ** 2)
 
     return math.acos((a ** 2 + b ** 2 - c ** 2) / (2 * a * b))
+
+
+def cos_between_three_points(p1: Point, p2: Point, p3: Point) -> float:
+    """
+    Calculates cosine of angle between three points via dot product (middle point is vertex).
+    Cheaper than :func:`angle_between_three_points`. If two points coincide, angle is considered to be zero
+    """
+    ax, ay = p1[0] - p2[0], p1[1] - p2[1]
+    bx, by = p3[0] - p2[0], p3[1] - p2[1]
+    lengths_product = math.hypot(ax, ay) * math.hypot(bx, by)
+    if lengths_product == 0:
+        return 1.0
+
+    return (ax * bx + ay * by) / lengths_product
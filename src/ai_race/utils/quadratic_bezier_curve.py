@@ -1,34 +1,38 @@
-from local_typing import Point, Curve
+from functools import lru_cache
+
+import numpy as np
+
+from local_typing import Curve
+
+
+@lru_cache(maxsize=32)
+def get_quadratic_basis(segment_points_number: int = 21) -> np.ndarray:
+    """
+    Returns Bernstein basis of quadratic Bezier curve sampled at `segment_points_number` evenly spaced parameters.
+    Matrix has shape (segment_points_number, 3) and is shared, so it is read-only
+    """
+    i = np.linspace(0, 1, segment_points_number)[:, np.newaxis]
+    basis = np.hstack([(1.0 - i) ** 2, 2 * (1.0 - i) * i, i ** 2])
+    basis.setflags(write=False)
+
+    return basis
 
 
 class QuadraticBezierCurve:
-    def __init__(self, points: Curve):
+    def __init__(self, points: Curve, segment_points_number: int = 21):
         self.points = points
         self.n = len(points)
+        self.segment_points_number = segment_points_number
 
-    def get_points(self):
-        curve_points = []
-
-        for index in range(0, self.n - 2, 2):
-            p1 = self.points[index]
-            p2 = self.points[index + 1]
-            p3 = self.points[index + 2]
-            segment_points = self.__get_segment_points(p1, p2, p3)
-            for point in segment_points:
-                curve_points.append(point)
-
-        return curve_points
+    def get_points(self) -> Curve:
+        if self.n < 3:
+            return []
 
-    @staticmethod
-    def __get_segment_points(p1: Point, p2: Point, p3: Point) -> Curve:
-        curve = []
-        for i in map(lambda x: x / 100.0, range(0, 105, 5)):
-            a = (1.0 - i) ** 2
-            b = 2 * (1.0 - i) * i
-            c = i ** 2
+        # Every segment is defined by three points, neighbouring segments share end point
+        points = np.asarray(self.points, dtype=float)
+        indices = np.arange(0, self.n - 2, 2)
+        control_points = np.stack([points[indices], points[indices + 1], points[indices + 2]], axis=1)
 
-            x = a * p1[0] + b * p2[0] + c * p3[0]
-            y = a * p1[1] + b * p2[1] + c * p3[1]
-            curve.append((x, y))
+        curve_points = np.matmul(get_quadratic_basis(self.segment_points_number), control_points)
 
-        return curve
+        return [tuple(point) for point in curve_points.reshape(-1, 2).tolist()]
@@ -0,0 +1,164 @@
+import typing as t
+import math
+import random
+
+import numpy as np
+
+from sprites.track import Track
+from utils.convex_hull import ConvexHull
+from utils.bezier_curve import BezierCurve
+from utils.math import cos_between_three_points, Radians
+from local_typing import Point, Curve
+
+
+class TrackBuilder:
+    """Generates random tracks. Doesn't depend on display, so it can be used in headless mode"""
+
+    def __init__(
+            self,
+            width: int,
+            height: int,
+            track_width: int = 100,
+            random_points_number: int = 7,
+            interpolation_segments_number: int = 15,
+            min_segment_angle: Radians = math.pi / 2
+    ):
+        """
+        :param width: Width of the area where track is generated
+        :param height: Height of the area where track is generated
+        :param track_width: Distance from central curve to inner and outer curves
+        :param random_points_number: Number of random points that form convex hull
+        :param interpolation_segments_number: Number of points on a Bezier curve between two hull points
+        :param min_segment_angle: Minimal angle between two segments of inner and outer curves
+        """
+        self.width = width
+        self.height = height
+        self.track_width = track_width
+        self.random_points_number = random_points_number
+        self.interpolation_segments_number = interpolation_segments_number
+        self.min_segment_angle = min_segment_angle
+        self.random = random.Random()
+
+    def get_parameters(self) -> t.Dict[str, t.Any]:
+        """Returns parameters that define generated track (together with seed)"""
+        return {
+            'width': self.width,
+            'height': self.height,
+            'track_width': self.track_width,
+            'random_points_number': self.random_points_number,
+            'interpolation_segments_number': self.interpolation_segments_number,
+            'min_segment_angle': self.min_segment_angle
+        }
+
+    def generate_convex_hull_points(self) -> Curve:
+        """Creates array of points that lie on convex hull"""
+        points = []
+        for i in range(self.random_points_number):
+            x = self.random.randint(self.width * 0.15, self.width * 0.85)
+            y = self.random.randint(self.height * 0.15, self.height * 0.85)
+            points.append((x, y))
+
+        hull = ConvexHull(points)
+        hull_points = hull.get_points()
+
+        return hull_points
+
+    def generate_bezier_curve_points(self, points: Curve) -> t.Tuple[Curve, Point]:
+        """Returns interpolated path of hull points through Bezier Curves and start point"""
+        bezier_curve = BezierCurve(points=points, curve_points_number=self.interpolation_segments_number)
+        bezier_curve_points = bezier_curve.get_points()
+        start_point = bezier_curve_points[max(bezier_curve.curve_points_number // 10, 2)]
+
+        return bezier_curve_points, start_point
+
+    def filter_curve(self, curve: Curve) -> Curve:
+        """
+        Deletes all redundant points that create too sharp angles (less than `self.min_segment_angle`).
+        Points are processed in one pass: accepted points are kept in a stack where all angles are valid,
+        so deleting a point only requires to check the angle at the previous point again
+        """
+        # Angle is less than minimal if its cosine is greater
+        max_cos = math.cos(self.min_segment_angle)
+
+        filtered_curve = []
+        for point in curve:
+            filtered_curve.append(point)
+            while (
+                    len(filtered_curve) >= 3 and
+                    cos_between_three_points(filtered_curve[-3], filtered_curve[-2], filtered_curve[-1]) > max_cos
+            ):
+                del filtered_curve[-2]
+
+        return filtered_curve
+
+    def get_offset_vectors(self, central_curve: Curve) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates offsets of inner and outer curves from every point of central curve.
+        Offset is directed along miter (average of normals of neighbouring segments), and its length keeps
+        both neighbouring walls at `self.track_width` from central curve (limited on very sharp turns)
+
+        :return: Points of central curve without duplicates and their offsets (both with shape (points, 2))
+        """
+        points = np.asarray(central_curve, dtype=float).reshape(-1, 2)
+
+        # Neighbouring Bezier curves share end points, such duplicates have no direction
+        keep = np.ones(len(points), dtype=bool)
+        keep[1:] = np.hypot(*np.diff(points, axis=0).T) > 1e-9
+        points = points[keep]
+        if len(points) < 2:
+            return points, np.zeros_like(points)
+
+        is_closed = np.hypot(*(points[-1] - points[0])) <= 1e-9
+
+        # Unit normals of segments, directed to the outer curve
+        directions = np.diff(points, axis=0)
+        normals = np.column_stack([directions[:, 1], -directions[:, 0]]) / np.hypot(*directions.T)[:, np.newaxis]
+
+        # Normals of incoming and outgoing segments of every point
+        incoming_normals = np.vstack([normals[-1:] if is_closed else normals[:1], normals])
+        outgoing_normals = np.vstack([normals, normals[:1] if is_closed else normals[-1:]])
+
+        miters = incoming_normals + outgoing_normals
+        miter_lengths = np.hypot(*miters.T)[:, np.newaxis]
+        # Segments that turn back have no miter, normal of incoming segment is used instead
+        miters = np.where(miter_lengths > 1e-9, miters / np.maximum(miter_lengths, 1e-9), incoming_normals)
+
+        miter_limit = 2.0
+        cos_half_angle = np.maximum(np.sum(miters * incoming_normals, axis=1), 1 / miter_limit)
+
+        return points, miters * (self.track_width / cos_half_angle)[:, np.newaxis]
+
+    def create_inner_and_outer_curves(self, central_curve: Curve) -> t.Tuple[Curve, Curve]:
+        points, offsets = self.get_offset_vectors(central_curve)
+
+        inner_curve_points = [tuple(point) for point in (points - offsets).tolist()]
+        outer_curve_points = [tuple(point) for point in (points + offsets).tolist()]
+
+        inner_curve_points = self.filter_curve(inner_curve_points)
+        outer_curve_points = self.filter_curve(outer_curve_points)
+        return inner_curve_points, outer_curve_points
+
+    def create_track(self, seed: t.Optional[int] = None) -> Track:
+        """
+        Creates new random track. The same seed and parameters of builder always give the same track
+
+        :param seed: Seed of random generator (default = None, which means random seed)
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.random.seed(seed)
+
+        # Hull points
+        convex_hull_points = self.generate_convex_hull_points()
+        # Bezier interpolation
+        central_curve, start_point = self.generate_bezier_curve_points(convex_hull_points)
+        # Inner and outer curves
+        inner_curve, outer_curve = self.create_inner_and_outer_curves(central_curve)
+
+        return Track(
+            central_curve=central_curve,
+            inner_curve=inner_curve,
+            outer_curve=outer_curve,
+            start_point=start_point,
+            seed=seed
+        )
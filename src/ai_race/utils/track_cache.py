@@ -0,0 +1,125 @@
+import typing as t
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from sprites.track import Track
+from physics.wall_store import WallStore
+from physics.progress import ProgressIndex
+from utils.track_builder import TrackBuilder
+
+TRACK_CACHE_VERSION = 3
+
+
+class TrackCache:
+    """
+    On-disk cache of generated tracks together with their walls, spatial index of walls and progress index.
+    Tracks are identified by seed and parameters of :class:`TrackBuilder`, so loading known track skips generation
+    """
+
+    def __init__(self, directory: str, track_builder: TrackBuilder, closed_walls: bool = False):
+        """
+        :param directory: Directory with cached tracks
+        :param track_builder: Builder that creates tracks that aren't cached yet
+        :param closed_walls: Whether walls are closed (see :meth:`Track.build_walls`)
+        """
+        self.directory = directory
+        self.track_builder = track_builder
+        self.closed_walls = closed_walls
+
+    def get_key(self, seed: int) -> str:
+        """Returns key of track with given seed that depends on all parameters of generation"""
+        parameters = {
+            'version': TRACK_CACHE_VERSION,
+            'seed': seed,
+            'closed_walls': self.closed_walls,
+            'wall_thickness': Track.WALL_THICKNESS,
+            'wall_index_cell_size': Track.WALL_INDEX_CELL_SIZE,
+            **self.track_builder.get_parameters()
+        }
+        return hashlib.sha1(json.dumps(parameters, sort_keys=True).encode()).hexdigest()[:16]
+
+    def get_path(self, seed: int) -> str:
+        return os.path.join(self.directory, f'track_{seed}_{self.get_key(seed)}.npz')
+
+    def get_track(self, seed: t.Optional[int] = None) -> Track:
+        """
+        Loads track from cache or creates (and caches) it if there is no such track yet
+
+        :param seed: Seed of track (default = None, which means random seed). Track with random seed is never
+            requested again, so it isn't cached
+        """
+        if seed is None:
+            track = self.track_builder.create_track()
+            track.build_walls(closed=self.closed_walls)
+            return track
+
+        track = self.load(seed)
+        if track is not None:
+            return track
+
+        track = self.track_builder.create_track(seed)
+        track.build_walls(closed=self.closed_walls)
+        self.save(track)
+
+        return track
+
+    def load(self, seed: int) -> t.Optional[Track]:
+        """
+        Loads track with given seed
+
+        :return: :class:`Track` instance or None if track isn't cached
+        """
+        path = self.get_path(seed)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path, allow_pickle=False) as data:
+            arrays = dict(data)
+
+        track = Track(
+            central_curve=arrays['central_curve'],
+            inner_curve=[tuple(point) for point in arrays['inner_curve'].tolist()],
+            outer_curve=[tuple(point) for point in arrays['outer_curve'].tolist()],
+            start_point=tuple(arrays['start_point'].tolist()),
+            seed=seed,
+            progress_index=ProgressIndex.from_arrays(self.__get_prefixed(arrays, 'progress_index_'))
+        )
+        track.walls = WallStore.from_arrays(self.__get_prefixed(arrays, 'walls_'))
+        track.closed_walls = self.closed_walls
+
+        return track
+
+    def save(self, track: Track) -> None:
+        """
+        Saves track with its precomputed structures. File is written to temporary path first and then renamed
+
+        :raises ValueError: If seed of track is unknown
+        """
+        if track.seed is None:
+            raise ValueError('Only tracks with known seed can be cached')
+        if track.walls is None or track.closed_walls != self.closed_walls:
+            track.build_walls(closed=self.closed_walls)
+
+        arrays = {
+            'central_curve': np.asarray(track.central_curve, dtype=float),
+            'inner_curve': np.asarray(track.inner_curve, dtype=float),
+            'outer_curve': np.asarray(track.outer_curve, dtype=float),
+            'start_point': np.asarray(track.start_point, dtype=float)
+        }
+        arrays.update({f'progress_index_{key}': value for key, value in track.progress_index.to_arrays().items()})
+        arrays.update({f'walls_{key}': value for key, value in track.walls.to_arrays().items()})
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.get_path(track.seed)
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def __get_prefixed(arrays: t.Mapping[str, np.ndarray], prefix: str) -> t.Dict[str, np.ndarray]:
+        """Returns arrays whose names start with prefix (prefix is removed from names)"""
+        return {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}